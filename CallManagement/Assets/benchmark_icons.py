@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark each stage of the icon pipeline
+
+Times every stage at several canvas sizes and records its peak traced
+memory (Python and NumPy allocations; Pillow's own image buffers are not
+visible to tracemalloc). Results can be saved as a JSON baseline, and a
+later run compared against it fails when a stage regresses past the
+threshold.
+
+    python3 benchmark_icons.py --save icon_bench.json
+    python3 benchmark_icons.py --compare icon_bench.json --threshold 0.25
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from PIL import Image
+
+import create_icon
+from icongen import backends, pipeline
+from icongen.ico import ico_bytes
+from icongen.png import EncodeOptions, encode_png
+from icongen.pyramid import ResizePyramid
+
+DEFAULT_SIZES = [256, 1024, 2048]
+
+# Differences smaller than these are timer/allocator noise, never regressions
+MIN_DELTA_SECONDS = 0.002
+MIN_DELTA_BYTES = 64 * 1024
+
+def _scaled(size, value):
+    return round(value * size / 1024)
+
+def _master(size):
+    return pipeline.create_icon(size=size, verbose=False)
+
+# Each stage takes the canvas size, does its untimed setup and returns the callable to time
+def stage_background(size):
+    margin, radius = pipeline.default_spec().layout(size)
+
+    def run():
+        # The mask is memoised per size; clear it so every run pays the full cost
+        if pipeline.HAS_NUMPY:
+            backends.rounded_rect_mask_array.cache_clear()
+        pipeline.create_gradient_background(size, margin, radius)
+    return run
+
+def stage_phone(size):
+    margin, radius = pipeline.default_spec().layout(size)
+    background = pipeline.create_gradient_background(size, margin, radius)
+    return lambda: pipeline.draw_phone_icon(background.copy(), size)
+
+def stage_iconset_resize(size):
+    master = _master(size)
+    targets = [s * scale for s, scale in pipeline.ICONSET_SIZES if s * scale < size]
+    return lambda: ResizePyramid(master, targets).images(targets)
+
+def stage_ico(size):
+    pyramid = ResizePyramid(_master(size), pipeline.ICO_SIZES)
+    images = {s: pyramid[s] for s in pipeline.ICO_SIZES}
+    return lambda: ico_bytes(images)
+
+def stage_png_encode(size):
+    master = _master(size)
+    options = EncodeOptions()
+    return lambda: encode_png(master, options)
+
+def stage_v1_gradient(size):
+    margin, radius = _scaled(size, 64), _scaled(size, 180)
+
+    def run():
+        img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        create_icon.fill_vertical_gradient(img, size, margin, radius)
+    return run
+
+STAGES = {
+    'background': stage_background,
+    'phone': stage_phone,
+    'iconset-resize': stage_iconset_resize,
+    'ico': stage_ico,
+    'png-encode': stage_png_encode,
+    'v1-gradient': stage_v1_gradient,
+}
+
+def measure(run, repeat):
+    """Best wall time over repeat runs, plus peak traced memory of one more run"""
+    run()  # warm-up: imports, lazy tables
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+def run_benchmarks(stages, sizes, repeat):
+    results = {}
+    for name in stages:
+        for size in sizes:
+            seconds, peak = measure(STAGES[name](size), repeat)
+            results[f"{name}@{size}"] = {'stage': name, 'size': size,
+                                         'seconds': seconds, 'peak_bytes': peak}
+            print(f"{name:<16} {size:>5}px  {seconds * 1000:9.2f} ms  {peak / 1e6:8.2f} MB peak")
+    return results
+
+def find_regressions(results, baseline, threshold):
+    """(key, metric, old, new) for every metric that grew by more than threshold"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric, floor in (('seconds', MIN_DELTA_SECONDS), ('peak_bytes', MIN_DELTA_BYTES)):
+            old, new = previous[metric], current[metric]
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append((key, metric, old, new))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stages', nargs='+', choices=sorted(STAGES), default=list(STAGES),
+                        help='stages to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help='canvas sizes in pixels (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timed runs per stage; the fastest counts (default: %(default)s)')
+    parser.add_argument('--save', metavar='JSON', help='write the results as a baseline')
+    parser.add_argument('--compare', metavar='JSON', help='baseline to check the results against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown or memory growth (default: %(default)s)')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.stages, args.sizes, args.repeat)
+
+    if args.save:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': pipeline.HAS_NUMPY,
+            'repeat': args.repeat,
+            'results': results,
+        }
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Saved baseline: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = find_regressions(results, baseline, args.threshold)
+        for key, metric, old, new in regressions:
+            print(f"❌ {key} {metric}: {old:.6g} -> {new:.6g} (+{new / old - 1:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No stage regressed more than {args.threshold:.0%} against {args.compare}")
+
+if __name__ == "__main__":
+    main()
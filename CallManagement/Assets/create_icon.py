@@ -4,8 +4,12 @@ Script to create Call Management app icon
 Creates a modern phone/call icon with gradient background
 """
 
-import subprocess
+import argparse
 import os
+import sys
+
+from icongen.icns import ICNS_SIZES, write_icns
+from icongen.tools import ToolError, has_tool, run_all, run_tool
 
 # Check if PIL is available, if not use a simple SVG approach
 try:
@@ -96,12 +100,56 @@ def create_simple_svg_icon():
     return svg_content
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--profile', nargs='?', const='icon_profile.json', metavar='TRACE',
+                        help='time every pipeline stage and write a Chrome trace (default: %(const)s)')
+    args = parser.parse_args()
+    
+    if not args.profile:
+        create_icons()
+        return
+    profiler = enable_profiling()
+    profiler.start()
+    try:
+        profiler.span('main', create_icons)
+    finally:
+        profiler.stop()
+        profiler.write(args.profile)
+        profiler.print_summary()
+        print(f"Profile written: {args.profile}")
+
+# Stages wrapped in spans by --profile; nothing is wrapped otherwise
+PROFILED_FUNCTIONS = [
+    'create_simple_svg_icon', 'load_svg_document', 'fill_vertical_gradient',
+    'create_png_icon_programmatically', 'collect_icns_images', 'write_icns',
+]
+
+def enable_profiling():
+    """Wrap the pipeline stages of this script in profiler spans"""
+    from icongen.profile import Profiler
+    
+    profiler = Profiler()
+    module = sys.modules[__name__]
+    profiler.instrument(module, PROFILED_FUNCTIONS)
+    profiler.instrument(module, ['run_tool', 'run_all'], {
+        'run_tool': lambda cmd, **kwargs: f"run {cmd[0]}",
+        'run_all': lambda commands, **kwargs: f"run {len(commands)} x {commands[0][0]}" if commands else "run",
+    })
+    try:
+        from icongen.svg import SvgDocument
+        profiler.instrument(SvgDocument, ['render'], {'render': lambda doc, width, height=None: f"svg render {width}"})
+    except ImportError:
+        pass
+    return profiler
+
+def create_icons():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
     # Create SVG file
+    svg_content = create_simple_svg_icon()
     svg_path = os.path.join(script_dir, "AppIcon.svg")
     with open(svg_path, 'w') as f:
-        f.write(create_simple_svg_icon())
+        f.write(svg_content)
     print(f"Created: {svg_path}")
     
     # Check if we can convert to PNG using sips or other tools
@@ -119,28 +167,37 @@ def main():
         # Try different conversion methods
         converted = False
         
-        # Method 1: Try rsvg-convert (if available)
-        try:
-            subprocess.run(['rsvg-convert', '-w', '1024', '-h', '1024', svg_path, '-o', png_1024], 
-                         check=True, capture_output=True)
+        # Method 0: Rasterize in-process (needs Pillow + NumPy)
+        document = load_svg_document(svg_content)
+        # Renders by pixel size: several iconset files share one size
+        renders = {}
+        if document is not None:
+            renders[1024] = document.render(1024)
+            renders[1024].save(png_1024, "PNG")
             converted = True
-            print("Converted using rsvg-convert")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            pass
+            print("Rendered SVG in-process")
+        
+        # Method 1: Try rsvg-convert (if available)
+        if not converted and has_tool('rsvg-convert'):
+            try:
+                run_tool(['rsvg-convert', '-w', '1024', '-h', '1024', svg_path, '-o', png_1024])
+                converted = True
+                print("Converted using rsvg-convert")
+            except ToolError as e:
+                print(f"rsvg-convert failed: {e}")
         
         # Method 2: Try qlmanage (macOS built-in)
-        if not converted:
+        if not converted and has_tool('qlmanage'):
             try:
-                subprocess.run(['qlmanage', '-t', '-s', '1024', '-o', script_dir, svg_path],
-                             check=True, capture_output=True)
+                run_tool(['qlmanage', '-t', '-s', '1024', '-o', script_dir, svg_path])
                 # qlmanage creates file with different name
                 ql_output = svg_path + ".png"
                 if os.path.exists(ql_output):
                     os.rename(ql_output, png_1024)
                     converted = True
                     print("Converted using qlmanage")
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                pass
+            except ToolError as e:
+                print(f"qlmanage failed: {e}")
         
         # Method 3: Use sips with a workaround (create from scratch)
         if not converted:
@@ -149,7 +206,8 @@ def main():
             converted = True
         
         if converted and os.path.exists(png_1024):
-            # Create all required sizes using sips
+            # Create all required sizes, natively or using sips
+            targets = []
             for size in sizes:
                 for scale in [1, 2]:
                     actual_size = size * scale if scale == 2 and size < 512 else size
@@ -160,23 +218,116 @@ def main():
                         filename = f"icon_{size}x{size}.png"
                     else:
                         filename = f"icon_{size}x{size}@2x.png"
-                    
-                    output_path = os.path.join(iconset_dir, filename)
-                    subprocess.run(['sips', '-z', str(actual_size), str(actual_size), 
-                                  png_1024, '--out', output_path],
-                                 capture_output=True)
+                    targets.append((filename, actual_size))
+            
+            # Iconset files written in this run; anything else in the directory may be stale
+            written = {}
+            if document is not None:
+                # Render each size straight from the SVG instead of resampling
+                for filename, actual_size in targets:
+                    if actual_size not in renders:
+                        renders[actual_size] = document.render(actual_size)
+                    renders[actual_size].save(os.path.join(iconset_dir, filename), "PNG")
+                    written[filename] = actual_size
                     print(f"Created: {filename}")
+            elif has_tool('sips'):
+                # All sizes at once: the batch takes about as long as the slowest resize
+                commands = [['sips', '-z', str(actual_size), str(actual_size), png_1024,
+                             '--out', os.path.join(iconset_dir, filename)]
+                            for filename, actual_size in targets]
+                results = run_all(commands, check=False)
+                for (filename, actual_size), result in zip(targets, results):
+                    if result.returncode == 0:
+                        written[filename] = actual_size
+                        print(f"Created: {filename}")
+                failures = [result for result in results if result.returncode != 0]
+                if failures:
+                    print(f"sips failed, resizing those sizes with Pillow instead: {ToolError(failures)}")
+            else:
+                print("sips not found (not on macOS?), resizing with Pillow instead")
             
-            # Create icns file
+            missing = [(filename, actual_size) for filename, actual_size in targets if filename not in written]
+            if missing:
+                written.update(resize_iconset_with_pillow(png_1024, iconset_dir, missing))
+            
+            # Create icns file in-process, no iconutil needed
             icns_path = os.path.join(script_dir, "AppIcon.icns")
-            subprocess.run(['iconutil', '-c', 'icns', iconset_dir, '-o', icns_path],
-                         capture_output=True)
+            write_icns(icns_path, collect_icns_images(iconset_dir, written, png_1024))
             print(f"Created: {icns_path}")
             
     except Exception as e:
         print(f"Error during conversion: {e}")
         print("Please install Pillow (pip install Pillow) or use an online SVG to ICO converter")
 
+def load_svg_document(svg_content):
+    """Parsed SVG ready to render at any size, or None without Pillow/NumPy"""
+    try:
+        from icongen.svg import SvgDocument
+    except ImportError:
+        return None
+    return SvgDocument(svg_content)
+
+# Top-to-bottom background colours (#6366F1 -> #A855F7)
+VERTICAL_GRADIENT_STOPS = [(0.0, (99, 102, 241)), (1.0, (168, 85, 247))]
+
+def fill_vertical_gradient(img, size, margin, radius):
+    """Fill the rounded-rect background with the vertical gradient"""
+    # Anti-aliased single pass when NumPy is available
+    try:
+        from icongen import coverage
+        from icongen.gradient import Gradient
+        import numpy as np
+        
+        # One table entry per row between the margins
+        gradient = Gradient(VERTICAL_GRADIENT_STOPS, 'linear', (0, margin), (0, size - margin),
+                            resolution=size - 2 * margin)
+        rgba = np.repeat(gradient.render(1, size), size, axis=1)
+        alpha = coverage.rounded_rect(size, size, (margin, margin, size - margin, size - margin), radius)
+        rgba[..., 3] = np.rint(alpha * 255).astype(np.uint8)
+        img.paste(Image.fromarray(rgba, 'RGBA'))
+        return
+    except ImportError:
+        pass
+    
+    # Hard-edged fill through the fastest available raster backend (pure Python at worst)
+    from icongen.backends import backend_for
+    
+    fill = backend_for('fill_gradient').fill_gradient(size, size, VERTICAL_GRADIENT_STOPS, (0, margin),
+                                                      (0, size - margin), size - 2 * margin)
+    img.paste(fill, (0, 0), backend_for('fill_mask').fill_mask(size, margin, radius))
+
+def resize_iconset_with_pillow(png_1024, iconset_dir, targets):
+    """Write (file name, pixel size) targets resized from the master; returns those written"""
+    if not HAS_PIL:
+        print(f"Pillow not available, {len(targets)} iconset sizes not written")
+        return {}
+    written = {}
+    master = Image.open(png_1024).convert('RGBA')
+    for filename, actual_size in targets:
+        master.resize((actual_size, actual_size), Image.LANCZOS).save(os.path.join(iconset_dir, filename), "PNG")
+        written[filename] = actual_size
+        print(f"Created: {filename}")
+    return written
+
+def collect_icns_images(iconset_dir, written, png_1024):
+    """PNG data for every icns size, from the iconset files written in this run or resized from the master.
+
+    written maps file name -> pixel size; other files in iconset_dir are ignored,
+    since they may be left over from an older icon.
+    """
+    images = {}
+    for filename, pixels in written.items():
+        with open(os.path.join(iconset_dir, filename), 'rb') as f:
+            images[pixels] = f.read()
+    
+    # Sizes no converter produced this run (e.g. no sips on Linux) come from the fresh master
+    missing = [size for size in ICNS_SIZES if size not in images]
+    if missing and HAS_PIL:
+        master = Image.open(png_1024).convert('RGBA')
+        for size in missing:
+            images[size] = master.resize((size, size), Image.LANCZOS)
+    return images
+
 def create_png_icon_programmatically(script_dir):
     """Create PNG icon using basic drawing if PIL is available, otherwise create via HTML"""
     
@@ -232,35 +383,7 @@ body { margin: 0; padding: 0; }
             margin = 64
             radius = 180
             
-            # Simple gradient approximation
-            for y in range(margin, size - margin):
-                progress = (y - margin) / (size - 2 * margin)
-                r = int(99 + (168 - 99) * progress)
-                g = int(102 + (85 - 102) * progress)  
-                b = int(241 + (247 - 241) * progress)
-                
-                for x in range(margin, size - margin):
-                    # Check if inside rounded rect
-                    in_rect = True
-                    # Top-left corner
-                    if x < margin + radius and y < margin + radius:
-                        if (x - margin - radius)**2 + (y - margin - radius)**2 > radius**2:
-                            in_rect = False
-                    # Top-right corner
-                    elif x > size - margin - radius and y < margin + radius:
-                        if (x - (size - margin - radius))**2 + (y - margin - radius)**2 > radius**2:
-                            in_rect = False
-                    # Bottom-left corner
-                    elif x < margin + radius and y > size - margin - radius:
-                        if (x - margin - radius)**2 + (y - (size - margin - radius))**2 > radius**2:
-                            in_rect = False
-                    # Bottom-right corner
-                    elif x > size - margin - radius and y > size - margin - radius:
-                        if (x - (size - margin - radius))**2 + (y - (size - margin - radius))**2 > radius**2:
-                            in_rect = False
-                    
-                    if in_rect:
-                        img.putpixel((x, y), (r, g, b, 255))
+            fill_vertical_gradient(img, size, margin, radius)
             
             # Draw phone icon (simplified)
             # This is a basic representation - for better quality use the SVG
@@ -274,15 +397,15 @@ body { margin: 0; padding: 0; }
             print("Pillow not available. Using alternative method...")
             # Create a placeholder using ImageMagick if available
             try:
-                subprocess.run([
+                run_tool([
                     'convert', '-size', '1024x1024', 
                     'gradient:#6366F1-#A855F7',
                     '-fill', 'white', '-gravity', 'center',
                     '-pointsize', '600', '-annotate', '0', '📞',
                     png_path
-                ], check=True, capture_output=True)
+                ])
                 print(f"Created PNG with ImageMagick: {png_path}")
-            except (subprocess.CalledProcessError, FileNotFoundError):
+            except (ToolError, FileNotFoundError):
                 print("ImageMagick not available either.")
                 print("\nPlease manually create AppIcon_1024.png or install Pillow:")
                 print("  pip3 install Pillow")
@@ -0,0 +1,3 @@
+"""
+Shared rendering helpers for the Call Management icon scripts
+"""
@@ -0,0 +1,7 @@
+"""
+python -m icongen: see icongen.cli
+"""
+
+from icongen.cli import main
+
+main()
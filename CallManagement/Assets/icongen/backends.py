@@ -0,0 +1,461 @@
+"""
+Pluggable raster backends with automatic selection
+
+A backend implements some of the raster operations the icon pipeline is
+built from:
+
+    fill_mask      rounded-rect coverage mask ('L', 255 inside)
+    fill_gradient  opaque linear gradient between two points ('RGBA')
+    draw_path      ellipses and polygons filled into a mask ('L')
+    composite      paste an image through a mask at an offset
+    resize         Lanczos downscale
+
+Pure Python, Pillow, NumPy and pycairo backends are probed once per process.
+For each operation every backend that supports it runs a small workload.
+Only backends whose pixels match the reference implementation exactly, at
+small and large sizes and for every gradient angle and stop layout checked,
+are eligible, so the automatic choice never changes the icon. The fastest
+eligible backend is used, and the choice can be kept in the build cache so
+later runs skip the benchmark. A forced backend may not match; key_data()
+names such choices so cached stages rendered with them stay separate.
+
+Images cross the interface as PIL images; the pure Python backend computes
+pixels itself and only uses Pillow as the container.
+"""
+
+import functools
+import json
+import math
+import os
+import platform
+import time
+
+from PIL import Image, ImageDraw
+
+from icongen.paint import css_line, linear_terms, normalize_stops
+
+OPERATIONS = ('fill_mask', 'fill_gradient', 'draw_path', 'composite', 'resize')
+
+# Implementation whose output defines correct pixels for each operation
+REFERENCE = {
+    'fill_mask': 'python',
+    'fill_gradient': 'python',
+    'draw_path': 'pillow',
+    'composite': 'pillow',
+    'resize': 'pillow',
+}
+
+# Bump when a backend's output or the benchmark changes, so cached choices are redone
+SELECTION_VERSION = 2
+
+BENCH_SIZE = 128
+BENCH_REPEAT = 3
+BENCH_STOPS = ((0.0, (99, 102, 241)), (0.5, (139, 92, 246)), (1.0, (168, 85, 247)))
+
+# Conformance is checked at the smallest icon size, the benchmark size and a large
+# size (512, not 1024: the pure Python gradient reference takes a second at 1024)
+CONFORMANCE_SIZES = (16, BENCH_SIZE, 512)
+
+# fill_gradient only draws linear gradients (radial and conic ones are rendered by
+# icongen.gradient), so conformance covers other angles and stop layouts instead
+CONFORMANCE_ANGLES = (0, 90, 250)
+CONFORMANCE_STOPS = (
+    ((0.0, (0, 0, 0)), (1.0, (255, 255, 255))),
+    ((0.2, (255, 0, 0, 128)), (0.5, (0, 255, 0)), (0.5, (0, 0, 255)), (0.8, (255, 255, 0))),
+)
+
+
+class Backend:
+    """Base class; subclasses list the operations they implement"""
+
+    name = None
+    operations = ()
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def supports(self, operation):
+        return operation in self.operations
+
+
+class PythonBackend(Backend):
+    """Plain Python loops; always available"""
+
+    name = 'python'
+    operations = ('fill_mask', 'fill_gradient')
+
+    def fill_mask(self, size, margin, radius):
+        lo = margin + radius
+        hi = size - margin - radius
+        inner = size - 2 * margin
+        rows = []
+        blank = bytes(size)
+        for y in range(size):
+            if not margin <= y < size - margin:
+                rows.append(blank)
+                continue
+            if lo <= y < hi:
+                rows.append(bytes(margin) + b'\xff' * inner + bytes(margin))
+                continue
+            row = bytearray(size)
+            for x in range(margin, size - margin):
+                # Corner regions in the same order as the original elif chain
+                if x < lo and y < lo:
+                    ccx, ccy = lo, lo
+                elif x >= hi and y < lo:
+                    ccx, ccy = hi, lo
+                elif x < lo and y >= hi:
+                    ccx, ccy = lo, hi
+                elif x >= hi and y >= hi:
+                    ccx, ccy = hi, hi
+                else:
+                    row[x] = 255
+                    continue
+                if (x - ccx) ** 2 + (y - ccy) ** 2 <= radius * radius:
+                    row[x] = 255
+            rows.append(bytes(row))
+        return Image.frombytes('L', (size, size), b''.join(rows))
+
+    def fill_gradient(self, width, height, stops, start, end, resolution):
+        table = self._color_table(normalize_stops(stops), resolution)
+        a, b, c = linear_terms(start, end)
+        a_res = a * resolution
+        rows = []
+        for y in range(height):
+            row_term = (y * b + c) * resolution
+            indices = (min(max(row_term + x * a_res, 0), resolution) for x in range(width))
+            rows.append(b''.join([table[round(i)] for i in indices]))
+        return Image.frombytes('RGBA', (width, height), b''.join(rows))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _color_table(stops, resolution):
+        """Same entries as icongen.gradient.color_lut, as 4-byte strings"""
+        offsets = [offset for offset, _ in stops]
+        inner = offsets[1:-1]
+        table = []
+        for i in range(resolution + 1):
+            progress = i / resolution
+            segment = sum(1 for offset in inner if offset <= progress)
+            span = offsets[segment + 1] - offsets[segment]
+            p = (progress - offsets[segment]) / span if span > 0 else 1.0
+            p = min(max(p, 0.0), 1.0)
+            start, end = stops[segment][1], stops[segment + 1][1]
+            table.append(bytes(int(float(s) + (float(e) - float(s)) * p) for s, e in zip(start, end)))
+        return table
+
+
+class PillowBackend(Backend):
+    """ImageDraw and Pillow's C resampling/compositing"""
+
+    name = 'pillow'
+    operations = ('fill_mask', 'draw_path', 'composite', 'resize')
+
+    def fill_mask(self, size, margin, radius):
+        mask = Image.new('L', (size, size), 0)
+        ImageDraw.Draw(mask).rounded_rectangle(
+            (margin, margin, size - margin - 1, size - margin - 1), radius, fill=255)
+        return mask
+
+    def draw_path(self, size, shapes):
+        width, height = size
+        mask = Image.new('L', (width, height), 0)
+        draw = ImageDraw.Draw(mask)
+        for kind, coords in shapes:
+            if kind == 'ellipse':
+                draw.ellipse(coords, fill=255)
+            else:
+                draw.polygon(coords, fill=255)
+        return mask
+
+    def composite(self, dst, src, mask, offset):
+        dst.paste(src, offset, mask)
+        return dst
+
+    def resize(self, img, size):
+        return img.resize((size, size), Image.LANCZOS)
+
+
+class NumpyBackend(Backend):
+    """Whole-array NumPy passes"""
+
+    name = 'numpy'
+    operations = ('fill_mask', 'fill_gradient')
+
+    @classmethod
+    def available(cls):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def fill_mask(self, size, margin, radius):
+        return Image.fromarray(rounded_rect_mask_array(size, margin, radius).astype('uint8') * 255, 'L')
+
+    def fill_gradient(self, width, height, stops, start, end, resolution):
+        from icongen.gradient import Gradient
+
+        rgba = Gradient(stops, 'linear', start, end, resolution=resolution).render(width, height)
+        return Image.frombuffer('RGBA', (width, height), rgba.tobytes(), 'raw', 'RGBA', 0, 1)
+
+
+@functools.lru_cache(maxsize=8)
+def rounded_rect_mask_array(size, margin, radius):
+    """Boolean NumPy mask of the rounded rect, same inside/outside test as the pixel loop.
+
+    Cached, so batch variants sharing a layout compute it once.
+    """
+    import numpy as np
+
+    ys, xs = np.ogrid[:size, :size]
+    lo = margin + radius
+    hi = size - margin - radius
+
+    inside = (xs >= margin) & (xs < size - margin) & (ys >= margin) & (ys < size - margin)
+
+    # Corner regions are tested in the same order as the original elif chain,
+    # so overlapping regions (radius > half the rect) resolve identically
+    left, right = xs < lo, xs >= hi
+    top, bottom = ys < lo, ys >= hi
+    regions = [
+        (left & top, lo, lo),
+        (right & top, hi, lo),
+        (left & bottom, lo, hi),
+        (right & bottom, hi, hi),
+    ]
+    claimed = np.zeros((size, size), dtype=bool)
+    for region, ccx, ccy in regions:
+        region = region & ~claimed
+        outside = (xs - ccx) ** 2 + (ys - ccy) ** 2 > radius * radius
+        inside &= ~(region & outside)
+        claimed |= region
+    inside.flags.writeable = False
+    return inside
+
+
+class CairoBackend(Backend):
+    """pycairo vector fills (aliased, to match the hard-edged reference)"""
+
+    name = 'cairo'
+    operations = ('fill_mask', 'fill_gradient', 'draw_path')
+
+    @classmethod
+    def available(cls):
+        try:
+            import cairo  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def _context(width, height, fmt):
+        import cairo
+
+        surface = cairo.ImageSurface(fmt, width, height)
+        context = cairo.Context(surface)
+        context.set_antialias(cairo.ANTIALIAS_NONE)
+        return surface, context
+
+    @staticmethod
+    def _mask_image(surface):
+        surface.flush()
+        return Image.frombuffer('L', (surface.get_width(), surface.get_height()), bytes(surface.get_data()),
+                                'raw', 'L', surface.get_stride(), 1)
+
+    def fill_mask(self, size, margin, radius):
+        import cairo
+
+        surface, context = self._context(size, size, cairo.FORMAT_A8)
+        lo, hi = margin + radius, size - margin - radius
+        context.new_sub_path()
+        context.arc(hi, lo, radius, -math.pi / 2, 0)
+        context.arc(hi, hi, radius, 0, math.pi / 2)
+        context.arc(lo, hi, radius, math.pi / 2, math.pi)
+        context.arc(lo, lo, radius, math.pi, 3 * math.pi / 2)
+        context.close_path()
+        context.fill()
+        return self._mask_image(surface)
+
+    def fill_gradient(self, width, height, stops, start, end, resolution):
+        import cairo
+
+        surface, context = self._context(width, height, cairo.FORMAT_ARGB32)
+        pattern = cairo.LinearGradient(*start, *end)
+        for offset, color in normalize_stops(stops):
+            pattern.add_color_stop_rgba(offset, *(c / 255 for c in color))
+        context.set_source(pattern)
+        context.paint()
+        surface.flush()
+        # ARGB32 is native-endian; on the little-endian build hosts that is BGRA in memory
+        return Image.frombuffer('RGBA', (width, height), bytes(surface.get_data()),
+                                'raw', 'BGRA', surface.get_stride(), 1)
+
+    def draw_path(self, size, shapes):
+        import cairo
+
+        surface, context = self._context(size[0], size[1], cairo.FORMAT_A8)
+        for kind, coords in shapes:
+            if kind == 'ellipse':
+                x1, y1, x2, y2 = coords
+                context.save()
+                context.translate((x1 + x2) / 2, (y1 + y2) / 2)
+                context.scale(max((x2 - x1) / 2, 1e-6), max((y2 - y1) / 2, 1e-6))
+                context.arc(0, 0, 1, 0, 2 * math.pi)
+                context.restore()
+            else:
+                context.move_to(*coords[0])
+                for point in coords[1:]:
+                    context.line_to(*point)
+                context.close_path()
+            context.fill()
+        return self._mask_image(surface)
+
+
+BACKENDS = [PythonBackend, PillowBackend, NumpyBackend, CairoBackend]
+
+
+@functools.lru_cache(maxsize=None)
+def probe():
+    """name -> backend instance for every backend importable here (probed once per process)"""
+    return {cls.name: cls() for cls in BACKENDS if cls.available()}
+
+
+def _workload(operation, size=BENCH_SIZE, angle=135, stops=BENCH_STOPS):
+    """Arguments for a call that exercises the operation like the icon does"""
+    if operation == 'fill_mask':
+        return (size, size // 16, size * 180 // 1024)
+    if operation == 'fill_gradient':
+        start, end = css_line(angle, size, size)
+        return (size, size, stops, start, end, 2 * size)
+    if operation == 'draw_path':
+        q = size / 8
+        return ((size, size), [('ellipse', (q, q, 3 * q, 2.5 * q)), ('ellipse', (4 * q, 5 * q, 7 * q, 7 * q)),
+                               ('polygon', [(2 * q, 2 * q), (5 * q, 6 * q), (6 * q, 5 * q), (3 * q, q)])])
+    if operation == 'composite':
+        dst = Image.new('RGBA', (size, size), (99, 102, 241, 255))
+        src = Image.new('RGBA', (size // 2, size // 2), (255, 255, 255, 230))
+        mask = Image.linear_gradient('L').resize((size // 2, size // 2))
+        return (dst, src, mask, (size // 4, size // 4))
+    if operation == 'resize':
+        return (Image.radial_gradient('L').convert('RGBA').resize((size * 4, size * 4)), size)
+    raise ValueError(f"unknown operation {operation!r}")
+
+
+def _conformance_cases(operation):
+    """Workloads a backend must reproduce exactly before it is selected"""
+    for size in CONFORMANCE_SIZES:
+        yield _workload(operation, size)
+        if operation == 'fill_gradient' and size <= BENCH_SIZE:
+            for angle in CONFORMANCE_ANGLES:
+                yield _workload(operation, size, angle=angle)
+            for stops in CONFORMANCE_STOPS:
+                yield _workload(operation, size, stops=stops)
+
+
+def _call(backend, operation, args):
+    # composite works in place, so every run gets a fresh destination
+    if operation == 'composite':
+        args = (args[0].copy(),) + tuple(args[1:])
+    return getattr(backend, operation)(*args)
+
+
+@functools.lru_cache(maxsize=None)
+def conforms(operation, name):
+    """Whether a backend's output for the operation matches the reference exactly in every conformance case"""
+    backends = probe()
+    reference = REFERENCE[operation]
+    if name == reference:
+        return True
+    if reference not in backends or name not in backends:
+        return False
+    try:
+        return all(_call(backends[name], operation, args).tobytes()
+                   == _call(backends[reference], operation, args).tobytes()
+                   for args in _conformance_cases(operation))
+    except Exception:
+        return False
+
+
+def benchmark(operation):
+    """name -> best time in seconds for each backend supporting the operation.
+
+    Backends whose output differs from the reference get None and are never selected.
+    """
+    backends = probe()
+    args = _workload(operation)
+    timings = {}
+    for name, backend in backends.items():
+        if not backend.supports(operation):
+            continue
+        if not conforms(operation, name):
+            timings[name] = None
+            continue
+        best = math.inf
+        for _ in range(BENCH_REPEAT):
+            start = time.perf_counter()
+            _call(backend, operation, args)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+def _environment():
+    """Everything the benchmark outcome depends on, for the cached choice's key"""
+    versions = {'python': platform.python_version(), 'machine': platform.machine(),
+                'pillow': Image.__version__, 'backends': sorted(probe())}
+    for name in ('numpy', 'cairo'):
+        if name in probe():
+            module = __import__(name)
+            versions[name] = getattr(module, '__version__', None) or getattr(module, 'version', None)
+    return versions
+
+
+_selected = {}
+
+
+def select(cache=None, forced=None):
+    """operation -> backend name, benchmarking once per process (or once per cache).
+
+    forced (or $ICON_BACKEND) picks one backend for every operation it supports.
+    """
+    forced = forced or os.environ.get('ICON_BACKEND')
+    if forced and forced not in probe():
+        raise ValueError(f"backend {forced!r} is not available here, choose from {sorted(probe())}")
+    if not _selected:
+        key = cache.key('backends', SELECTION_VERSION, _environment()) if cache is not None else None
+        data = cache.lookup(key) if key else None
+        if data is not None:
+            _selected.update(json.loads(data))
+        else:
+            for operation in OPERATIONS:
+                timings = {name: t for name, t in benchmark(operation).items() if t is not None}
+                _selected[operation] = min(timings, key=timings.get) if timings else REFERENCE[operation]
+            if key:
+                cache.store(key, json.dumps(_selected, sort_keys=True).encode('utf-8'))
+    choice = dict(_selected)
+    if forced:
+        for operation in OPERATIONS:
+            if probe()[forced].supports(operation):
+                choice[operation] = forced
+    return choice
+
+
+def use(choice):
+    """Adopt a selection made elsewhere, e.g. by the parent of a worker process"""
+    _selected.clear()
+    _selected.update(choice)
+
+
+def backend_for(operation, cache=None, forced=None):
+    """Backend instance selected for an operation"""
+    return probe()[select(cache, forced)[operation]]
+
+
+def key_data():
+    """Selected (operation, backend) pairs whose pixels differ from the reference, for cache keys.
+
+    Empty unless a backend was forced, so automatic choices share cached stages.
+    """
+    return sorted((operation, name) for operation, name in select().items() if not conforms(operation, name))
@@ -0,0 +1,165 @@
+"""
+Content-addressed on-disk cache for icon build stages
+
+Every stage output (rendered layers, the master raster, each resized level,
+encoded PNG/ICO/ICNS bytes) is stored under a key derived from a hash of
+everything that can change it. A stage whose key is already present is
+skipped, so a rebuild with unchanged parameters never renders anything.
+Entries are pruned least recently used first once the directory grows past
+a size limit, so edits that keep producing new keys do not fill the disk.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+from PIL import Image
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "callmanagement-icons")
+
+# Most recent in-memory layers kept per process (a watch session produces a new key per edit)
+KEEP_LIMIT = 32
+
+# On-disk size the cache is pruned back to after a build; one full build writes about 21 MB
+DEFAULT_MAX_MB = 256
+
+ENTRY_SUFFIXES = ('.bin', '.raw')
+
+
+def default_cache_dir():
+    """Cache location, overridable with ICON_CACHE_DIR"""
+    return os.environ.get("ICON_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+class BuildCache:
+    """Stage cache keyed by parameter hashes; root=None disables it"""
+
+    def __init__(self, root=None, version=0):
+        self.root = root
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        # In-process copies of layers shared between builds, kept even without a disk cache
+        self._kept = OrderedDict()
+        if root:
+            os.makedirs(root, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return self.root is not None
+
+    def key(self, stage, *parts):
+        """Stable hex key for a stage and its inputs (any JSON-serialisable values)"""
+        payload = json.dumps([self.version, stage, parts], sort_keys=True, default=str)
+        return f"{stage}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}"
+
+    def _path(self, key, suffix):
+        return os.path.join(self.root, key + suffix)
+
+    def _write(self, path, data):
+        # Write-then-rename so parallel builds never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _hit(self, path):
+        self.hits += 1
+        # Hits refresh the mtime, which prune() uses as the last-used time
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        """(mtime, size, path) of every entry on disk, oldest first"""
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(ENTRY_SUFFIXES):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def prune(self, max_bytes=DEFAULT_MAX_MB << 20):
+        """Delete least recently used entries until the cache fits in max_bytes.
+
+        Returns (entries removed, bytes freed).
+        """
+        if not self.enabled or not os.path.isdir(self.root):
+            return 0, 0
+        entries = self._entries()
+        excess = sum(size for _, size, _ in entries) - max_bytes
+        removed = freed = 0
+        for _, size, path in entries:
+            if freed >= excess:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # A parallel build pruned it first
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def clear(self):
+        """Delete every entry; returns (entries removed, bytes freed)"""
+        return self.prune(0)
+
+    def lookup(self, key):
+        """Cached bytes for key, or None on a miss (counted either way)"""
+        if not self.enabled:
+            return None
+        path = self._path(key, '.bin')
+        if os.path.exists(path):
+            self._hit(path)
+            with open(path, 'rb') as f:
+                return f.read()
+        self.misses += 1
+        return None
+
+    def store(self, key, data):
+        if self.enabled:
+            self._write(self._path(key, '.bin'), data)
+
+    def data(self, key, produce):
+        """Cached bytes for key, calling produce() on a miss"""
+        data = self.lookup(key)
+        if data is None:
+            data = produce()
+            self.store(key, data)
+        return data
+
+    def image(self, key, produce, keep=False):
+        """Cached raster for key, stored uncompressed so a hit costs one read.
+
+        With keep=True the image also stays in memory for later builds in this
+        process (e.g. a handset layer shared by batch variants, or the background
+        between watch-mode edits); callers must treat it as read-only. Only the
+        KEEP_LIMIT most recently used images are kept.
+        """
+        if keep:
+            if key not in self._kept:
+                self._kept[key] = self.image(key, produce)
+                if len(self._kept) > KEEP_LIMIT:
+                    self._kept.popitem(last=False)
+            else:
+                self.hits += 1
+                self._kept.move_to_end(key)
+            return self._kept[key]
+        if not self.enabled:
+            return produce()
+        path = self._path(key, '.raw')
+        if os.path.exists(path):
+            self._hit(path)
+            with open(path, 'rb') as f:
+                header, pixels = f.read().split(b'\n', 1)
+            mode, width, height = header.decode('ascii').split()
+            return Image.frombytes(mode, (int(width), int(height)), pixels)
+        self.misses += 1
+        img = produce()
+        header = f"{img.mode} {img.width} {img.height}\n".encode('ascii')
+        self._write(path, header + img.tobytes())
+        return img
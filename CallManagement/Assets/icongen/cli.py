@@ -0,0 +1,181 @@
+"""
+Command line for the Call Management icon build
+
+    python -m icongen build [--only TARGET ...]   everything, or a subset
+    python -m icongen render|iconset|icns|ico     one raster output
+    python -m icongen svg                         the vector icon, no rendering
+
+Only argparse is imported up front. Pillow, NumPy and the pipeline are
+imported inside the command that needs them, so --help and `svg` return
+without loading any of them.
+"""
+
+import argparse
+import importlib.util
+import sys
+
+TARGETS = ('render', 'iconset', 'icns', 'ico', 'svg', 'linux')
+
+# Literal copies of icongen.png.FILTERS/STRATEGIES and the backend names, so --help imports nothing
+PNG_FILTERS = ('adaptive', 'average', 'none', 'paeth', 'sub', 'up')
+PNG_STRATEGIES = ('default', 'filtered', 'fixed', 'huffman', 'rle')
+BACKEND_NAMES = ('python', 'pillow', 'numpy', 'cairo')
+
+SHORTCUTS = {
+    'render': 'write AppIcon_1024.png',
+    'iconset': 'write AppIcon.iconset/',
+    'icns': 'write AppIcon.icns',
+    'ico': 'write AppIcon.ico',
+    'linux': 'write the hicolor tree, scalable SVG and window icon as one archive',
+}
+
+
+def _add_render_options(parser):
+    """Options shared by every command that rasterizes"""
+    parser.add_argument('--spec', help='icon spec (.json or .toml) to render (default: icon_spec.json)')
+    parser.add_argument('--out', help='output directory (default: the Assets directory)')
+    parser.add_argument('--antialias', action='store_true',
+                        help='render smooth edges with analytic coverage (requires NumPy)')
+    parser.add_argument('--native', action='store_true',
+                        help='render every size from the vector geometry in parallel instead of downsampling')
+    parser.add_argument('--cache-dir',
+                        help='build cache location (default: $ICON_CACHE_DIR or ~/.cache/callmanagement-icons)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='render everything from scratch without reading or writing the cache')
+    parser.add_argument('--cache-size', type=int, metavar='MB',
+                        help='prune least recently used cache entries beyond this size after a build '
+                             '(default: 256)')
+    parser.add_argument('--png-level', type=int, default=9, choices=range(10), metavar='0-9',
+                        help='zlib compression level for PNG output (default: %(default)s)')
+    parser.add_argument('--png-filter', default='adaptive', choices=PNG_FILTERS,
+                        help='PNG scanline filter (default: %(default)s)')
+    parser.add_argument('--png-strategy', default='filtered', choices=PNG_STRATEGIES,
+                        help='zlib deflate strategy (default: %(default)s)')
+    parser.add_argument('--palette', action='store_true',
+                        help='losslessly store PNGs as RGB or palette images when the colours allow it')
+    parser.add_argument('--encode-threads', type=int,
+                        help='threads for parallel PNG encoding (default: one per CPU)')
+    parser.add_argument('--backend', default='auto', choices=('auto',) + BACKEND_NAMES,
+                        help='raster backend for every operation it supports; auto benchmarks the '
+                             'installed ones once and uses the fastest per operation (default: %(default)s)')
+    parser.add_argument('--profile', nargs='?', const='icon_profile.json', metavar='TRACE',
+                        help='time every pipeline stage and write a Chrome trace (default: %(const)s)')
+
+
+def _add_build_options(parser):
+    """Modes only the full build command offers"""
+    parser.add_argument('--only', nargs='+', choices=TARGETS, metavar='TARGET',
+                        help=f"outputs to write, any of {', '.join(TARGETS)} "
+                             "(default: render iconset icns ico)")
+    parser.add_argument('--icns-only', action='store_true',
+                        help='same as --only icns (used by the macOS bundle script)')
+    parser.add_argument('--batch', nargs='+', metavar='SPEC',
+                        help='render several variant specs into OUT/<spec name>/ in one run')
+    parser.add_argument('--stream', nargs='+', type=int, metavar='SIZE',
+                        help='render anti-aliased SIZE x SIZE masters (e.g. 4096 8192) strip by strip '
+                             'into AppIcon_<SIZE>.png with bounded memory (requires NumPy)')
+    parser.add_argument('--strip-height', type=int,
+                        help='rows per strip for --stream (default: 64)')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and refresh icon_watch.png/.html whenever the spec changes')
+    parser.add_argument('--preview-size', type=int, default=512,
+                        help='preview size for --watch (default: %(default)s)')
+    parser.add_argument('--verify', action='store_true',
+                        help='render in memory and compare with the committed AppIcon_1024.png, iconset '
+                             'and each image inside AppIcon.ico and AppIcon.icns; '
+                             'the master and sizes resized straight from it must match exactly, smaller sizes '
+                             'within the --verify-* tolerances; exits with status 1 and writes diff heatmaps '
+                             'when a file is out of tolerance')
+    parser.add_argument('--verify-max-error', type=float, default=16,
+                        help='largest accepted per-channel error for --verify at cascaded sizes (default: %(default)s)')
+    parser.add_argument('--verify-mean-error', type=float, default=1.0,
+                        help='largest accepted mean error for --verify at cascaded sizes (default: %(default)s)')
+    parser.add_argument('--verify-hash-distance', type=int, default=4,
+                        help='largest accepted perceptual hash distance for --verify at cascaded sizes '
+                             '(default: %(default)s)')
+    parser.add_argument('--clean-cache', action='store_true',
+                        help='delete every entry in the build cache and exit')
+    parser.add_argument('--list-backends', action='store_true',
+                        help='benchmark the available raster backends and show which one each operation uses')
+    _add_archive_options(parser)
+
+
+def _add_archive_options(parser):
+    parser.add_argument('--archive-format', default='tar', choices=('tar', 'zip'),
+                        help='container for the linux target: AppIcon-linux.tar.gz or .zip (default: %(default)s)')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='icongen', description='Build the Call Management app icon assets.')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    build = commands.add_parser('build', help='write every output, or the --only subset')
+    _add_render_options(build)
+    _add_build_options(build)
+    build.set_defaults(handler=_run_build, targets=None)
+
+    # Shortcuts leave the build-only modes at their defaults
+    modes = argparse.ArgumentParser(add_help=False)
+    _add_build_options(modes)
+    for target, description in SHORTCUTS.items():
+        shortcut = commands.add_parser(target, help=f'{description} (build --only {target})')
+        _add_render_options(shortcut)
+        if target == 'linux':
+            _add_archive_options(shortcut)
+        shortcut.set_defaults(handler=_run_build, **vars(modes.parse_args([])), targets=[target])
+
+    svg = commands.add_parser('svg', help='write AppIcon_spec.svg straight from the spec, without rendering')
+    svg.add_argument('--spec', help='icon spec (.json or .toml) to export (default: icon_spec.json)')
+    svg.add_argument('--out', help='output directory (default: the Assets directory)')
+    svg.set_defaults(handler=_run_svg)
+    return parser
+
+
+def _has_numpy():
+    return importlib.util.find_spec('numpy') is not None
+
+
+def _run_svg(parser, args):
+    from icongen.spec import ASSETS_DIR, DEFAULT_SPEC_PATH, IconSpec
+    from icongen.vector import write_svg
+
+    spec = IconSpec.from_file(args.spec or DEFAULT_SPEC_PATH)
+    try:
+        write_svg(spec, args.out or ASSETS_DIR)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+def _run_build(parser, args):
+    if args.icns_only:
+        args.targets = ['icns']
+    elif args.only:
+        args.targets = args.only
+    for flag, needed in (('--antialias', args.antialias), ('--stream', args.stream), ('--verify', args.verify)):
+        if needed and not _has_numpy():
+            parser.error(f"{flag} requires NumPy (pip install numpy)")
+
+    from icongen import pipeline
+
+    args.spec = args.spec or pipeline.DEFAULT_SPEC_PATH
+    if not args.profile:
+        pipeline.run(args)
+        return
+    profiler = pipeline.enable_profiling()
+    profiler.start()
+    try:
+        profiler.span('main', pipeline.run, args)
+    finally:
+        profiler.stop()
+        profiler.write(args.profile)
+        profiler.print_summary()
+        print(f"Profile written: {args.profile}")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        sys.exit(2)
+    args.handler(parser, args)
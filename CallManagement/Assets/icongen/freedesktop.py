@@ -0,0 +1,71 @@
+"""
+Linux icon bundle: freedesktop hicolor tree plus window icon in one archive
+
+Lays out the PNGs the build already encoded as hicolor/<N>x<N>/apps/,
+adds the scalable SVG and the PNG the Avalonia window uses on Linux, and
+streams them into a .tar.gz or .zip straight from memory. Entry times are
+fixed, so an unchanged icon produces a byte-identical archive.
+"""
+
+import gzip
+import io
+import tarfile
+import zipfile
+
+# Standard hicolor theme sizes up to 512 (the icon cache has no larger bucket)
+HICOLOR_SIZES = [16, 22, 24, 32, 48, 64, 128, 256, 512]
+
+# Icon name the .desktop file refers to (Icon=callmanagement)
+ICON_NAME = "callmanagement"
+
+WINDOW_ICON_SIZE = 256
+WINDOW_ICON_PATH = "AppIcon.png"
+
+# 1980-01-01, the earliest timestamp a zip entry can hold
+FIXED_MTIME = 315532800
+
+
+def hicolor_entries(pngs, svg=None, name=ICON_NAME):
+    """(archive path, bytes) pairs for a size -> PNG bytes mapping and optional SVG text"""
+    entries = [(f"hicolor/{size}x{size}/apps/{name}.png", pngs[size]) for size in HICOLOR_SIZES]
+    if svg is not None:
+        entries.append((f"hicolor/scalable/apps/{name}.svg", svg.encode('utf-8')))
+    entries.append((WINDOW_ICON_PATH, pngs[WINDOW_ICON_SIZE]))
+    return entries
+
+
+def write_tar(fileobj, entries):
+    """Stream entries into fileobj as a gzip-compressed tar"""
+    with gzip.GzipFile(fileobj=fileobj, mode='wb', mtime=FIXED_MTIME) as compressed:
+        # Stream mode ('w|') never seeks, so fileobj can be a pipe
+        with tarfile.open(fileobj=compressed, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+            for path, data in entries:
+                info = tarfile.TarInfo(path)
+                info.size = len(data)
+                info.mtime = FIXED_MTIME
+                info.mode = 0o644
+                tar.addfile(info, io.BytesIO(data))
+
+
+def write_zip(fileobj, entries):
+    """Write entries into fileobj as a deflated zip"""
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for path, data in entries:
+            info = zipfile.ZipInfo(path, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, data)
+
+
+# Format name -> (file extension, writer)
+ARCHIVE_FORMATS = {
+    'tar': ('.tar.gz', write_tar),
+    'zip': ('.zip', write_zip),
+}
+
+
+def write_archive(path, entries, archive_format='tar'):
+    _, writer = ARCHIVE_FORMATS[archive_format]
+    with open(path, 'wb') as f:
+        writer(f, entries)
+
@@ -0,0 +1,113 @@
+"""
+Pure-Python writer for Apple .icns containers
+
+Builds the same PNG-based icon families that `iconutil -c icns` produces,
+straight from in-memory images, so no AppIcon.iconset directory or macOS
+tooling is needed.
+"""
+
+import io
+import struct
+
+from PIL import Image
+
+# (OSType, pixel size) for every PNG-encoded entry of a standard iconset
+ICNS_TYPES = [
+    (b'icp4', 16),   # 16x16
+    (b'icp5', 32),   # 32x32
+    (b'ic11', 32),   # 16x16@2x
+    (b'ic12', 64),   # 32x32@2x
+    (b'ic07', 128),  # 128x128
+    (b'ic13', 256),  # 128x128@2x
+    (b'ic08', 256),  # 256x256
+    (b'ic14', 512),  # 256x256@2x
+    (b'ic09', 512),  # 512x512
+    (b'ic10', 1024), # 512x512@2x
+]
+
+ICNS_SIZES = sorted({size for _, size in ICNS_TYPES})
+
+# Run-length encoded ARGB entries iconutil writes for the two smallest sizes (read only)
+ARGB_TYPES = {b'ic04': 16, b'ic05': 32}
+
+
+def _png_bytes(image):
+    """PNG payload for an entry: raw bytes are used as-is, images are encoded"""
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def icns_bytes(images):
+    """Build an .icns file from a mapping of pixel size -> PIL image or PNG bytes.
+
+    Sizes missing from the mapping are left out of the container. Each
+    distinct pixel size is encoded once even when it backs two entries.
+    """
+    encoded = {size: _png_bytes(images[size]) for size in ICNS_SIZES if size in images}
+    entries = [(ostype, encoded[size]) for ostype, size in ICNS_TYPES if size in encoded]
+    if not entries:
+        raise ValueError("no images for any ICNS size")
+
+    # Table of contents lists each entry's type and total length
+    toc = b''.join(ostype + struct.pack('>I', len(data) + 8) for ostype, data in entries)
+    chunks = [b'TOC ' + struct.pack('>I', len(toc) + 8) + toc]
+    chunks += [ostype + struct.pack('>I', len(data) + 8) + data for ostype, data in entries]
+
+    body = b''.join(chunks)
+    return b'icns' + struct.pack('>I', len(body) + 8) + body
+
+
+def read_icns(data):
+    """Mapping of OSType -> payload for every entry of .icns bytes except the TOC"""
+    if data[:4] != b'icns':
+        raise ValueError("not an .icns file")
+    entries = {}
+    offset = 8
+    while offset < len(data):
+        ostype, length = data[offset:offset + 4], struct.unpack_from('>I', data, offset + 4)[0]
+        if length < 8:
+            raise ValueError(f"corrupt .icns entry {ostype!r}")
+        if ostype != b'TOC ':
+            entries[ostype] = data[offset + 8:offset + length]
+        offset += length
+    return entries
+
+
+def _unpack_bits(data, count):
+    """Apple's icon RLE: a byte below 0x80 copies that many plus one bytes, others repeat the next byte"""
+    out = bytearray()
+    i = 0
+    while len(out) < count:
+        run = data[i]
+        if run < 0x80:
+            out += data[i + 1:i + run + 2]
+            i += run + 2
+        else:
+            out += bytes([data[i + 1]]) * (run - 0x80 + 3)
+            i += 2
+    return bytes(out[:count])
+
+
+def entry_image(ostype, payload):
+    """RGBA image of a PNG or ARGB entry, or None for other entry types (e.g. 'info')"""
+    if payload.startswith(b'\x89PNG'):
+        with Image.open(io.BytesIO(payload)) as img:
+            return img.convert('RGBA')
+    if ostype in ARGB_TYPES and payload.startswith(b'ARGB'):
+        size = ARGB_TYPES[ostype]
+        planes = _unpack_bits(payload[4:], 4 * size * size)
+        a, r, g, b = (Image.frombytes('L', (size, size), planes[i * size * size:(i + 1) * size * size])
+                      for i in range(4))
+        return Image.merge('RGBA', (r, g, b, a))
+    return None
+
+
+def write_icns(path, images):
+    """Write an .icns file in a single pass"""
+    data = icns_bytes(images)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
@@ -0,0 +1,101 @@
+"""
+Pure-Python writer for Windows .ico containers
+
+Every entry is written from its own already-rendered image, so nothing is
+resampled here. Entries of 256 px and up are stored PNG-compressed (as
+Windows Vista and later expect), smaller ones as 32-bit BMP/DIB with an
+AND mask, which every Windows version and the .NET resource loader read.
+"""
+
+import io
+import struct
+
+from PIL import Image
+
+from icongen.png import EncodeOptions, encode_png
+
+# Entries at least this big are PNG-compressed, smaller ones are DIBs
+PNG_MIN_SIZE = 256
+
+ICONDIR = struct.Struct('<HHH')
+ICONDIRENTRY = struct.Struct('<BBBBHHII')
+BITMAPINFOHEADER = struct.Struct('<IiiHHIIiiII')
+
+
+def dib_bytes(image):
+    """32-bit BGRA DIB with AND mask, as stored inside an ICO entry"""
+    image = image.convert('RGBA')
+    width, height = image.size
+    # DIB rows run bottom-up; Pillow's raw encoder flips and swizzles in one pass
+    pixels = image.tobytes('raw', 'BGRA', 0, -1)
+
+    # AND mask: 1 bit per pixel, set where fully transparent, rows padded to 32 bits
+    mask = image.getchannel('A').point(lambda a: 255 if a == 0 else 0).convert('1', dither=Image.NONE)
+    packed = mask.tobytes('raw', '1', 0, -1)
+    row_bytes = (width + 7) // 8
+    stride = (width + 31) // 32 * 4
+    padding = bytes(stride - row_bytes)
+    mask_bytes = b''.join(packed[i:i + row_bytes] + padding for i in range(0, len(packed), row_bytes))
+
+    # The height field covers the colour rows and the mask rows together
+    header = BITMAPINFOHEADER.pack(BITMAPINFOHEADER.size, width, height * 2, 1, 32, 0,
+                                   len(pixels) + len(mask_bytes), 0, 0, 0, 0)
+    return header + pixels + mask_bytes
+
+
+def _entry_bytes(size, image, options):
+    """Payload for one entry: raw bytes are used as-is (pre-encoded PNG), images are encoded"""
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    if size >= PNG_MIN_SIZE:
+        # Windows reads only 32-bit RGBA PNG entries reliably, so never palette-reduce
+        return encode_png(image, EncodeOptions(options.level, options.filter, options.strategy))
+    return dib_bytes(image)
+
+
+def ico_bytes(images, options=None):
+    """Build an .ico file from a mapping of pixel size -> PIL image.
+
+    Entries of PNG_MIN_SIZE and up may also be given as RGBA PNG bytes, so a
+    PNG already encoded for another output is reused. Entries are written
+    smallest first, with the directory and all payloads in a single pass.
+    """
+    if not images:
+        raise ValueError("no images for the ICO")
+    options = options or EncodeOptions()
+    sizes = sorted(images)
+    if sizes[-1] > 256:
+        raise ValueError(f"ICO entries are at most 256 px, got {sizes[-1]}")
+    payloads = [_entry_bytes(size, images[size], options) for size in sizes]
+
+    header = ICONDIR.pack(0, 1, len(sizes))
+    offset = ICONDIR.size + ICONDIRENTRY.size * len(sizes)
+    directory = []
+    for size, data in zip(sizes, payloads):
+        # A dimension of 256 is stored as 0
+        dimension = size % 256
+        directory.append(ICONDIRENTRY.pack(dimension, dimension, 0, 0, 1, 32, len(data), offset))
+        offset += len(data)
+    return header + b''.join(directory) + b''.join(payloads)
+
+
+def read_ico(data):
+    """Mapping of pixel size -> RGBA image for every entry of .ico bytes"""
+    _, kind, count = ICONDIR.unpack_from(data)
+    if kind != 1:
+        raise ValueError("not an .ico file")
+    images = {}
+    for index in range(count):
+        width, height, _, _, _, _, length, offset = ICONDIRENTRY.unpack_from(
+            data, ICONDIR.size + index * ICONDIRENTRY.size)
+        payload = data[offset:offset + length]
+        size = width or 256
+        if payload.startswith(b'\x89PNG'):
+            with Image.open(io.BytesIO(payload)) as img:
+                images[size] = img.convert('RGBA')
+            continue
+        header_size = BITMAPINFOHEADER.unpack_from(payload)[0]
+        # Only the 32-bit colour rows are needed; their alpha supersedes the AND mask
+        pixels = payload[header_size:header_size + size * (height or 256) * 4]
+        images[size] = Image.frombytes('RGBA', (size, height or 256), pixels, 'raw', 'BGRA', 0, -1)
+    return images
@@ -0,0 +1,103 @@
+"""
+Bounding-box-limited layers
+
+A Layer is an RGBA image placed at an offset on a larger canvas and
+transparent everywhere else. Drawing, rotating and compositing only touch
+the layer's box, so a small shape on a big canvas costs in proportion to
+the shape rather than the canvas, while the result matches doing the same
+operations on a full-canvas layer.
+"""
+
+import math
+
+from PIL import Image
+
+# Transparent border kept around drawn content, wider than the bicubic kernel reach
+KERNEL_PAD = 4
+
+
+def bounding_box(points, pad=0):
+    """Integer (x1, y1, x2, y2) enclosing the points, grown by pad on every side"""
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return (math.floor(min(xs)) - pad, math.floor(min(ys)) - pad,
+            math.ceil(max(xs)) + 1 + pad, math.ceil(max(ys)) + 1 + pad)
+
+
+def union_box(boxes):
+    boxes = list(boxes)
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+def clip_box(box, width, height):
+    """box clipped to the canvas, or None when nothing is left"""
+    x1, y1, x2, y2 = max(box[0], 0), max(box[1], 0), min(box[2], width), min(box[3], height)
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return x1, y1, x2, y2
+
+
+def _rotation_matrix(angle, center):
+    """Inverse affine matrix of Image.rotate(angle, center=center), computed the same way"""
+    angle = -math.radians(angle % 360.0)
+    a, b = round(math.cos(angle), 15), round(math.sin(angle), 15)
+    d, e = round(-math.sin(angle), 15), round(math.cos(angle), 15)
+    cx, cy = center
+    c = a * -cx + b * -cy + 0.0 + cx
+    f = d * -cx + e * -cy + 0.0 + cy
+    return a, b, c, d, e, f
+
+
+def rotated_box(box, angle, center, pad=2):
+    """Box enclosing box after rotating it like Image.rotate(angle, center=center)"""
+    a, b, c, d, e, f = _rotation_matrix(angle, center)
+    # The matrix maps destination to source; the inverse of a rotation is its transpose
+    corners = []
+    for x, y in ((box[0], box[1]), (box[2], box[1]), (box[2], box[3]), (box[0], box[3])):
+        x, y = x - c, y - f
+        corners.append((a * x + d * y, b * x + e * y))
+    return bounding_box(corners, pad)
+
+
+class Layer:
+    """RGBA image at (x, y) on a width x height canvas"""
+
+    def __init__(self, image, x, y, width, height):
+        self.image = image
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def box(self):
+        return self.x, self.y, self.x + self.image.width, self.y + self.image.height
+
+    @classmethod
+    def blank(cls, box, width, height):
+        """Transparent layer covering box (clipped to the canvas)"""
+        box = clip_box(box, width, height) or (0, 0, 0, 0)
+        image = Image.new('RGBA', (box[2] - box[0], box[3] - box[1]), (0, 0, 0, 0))
+        return cls(image, box[0], box[1], width, height)
+
+    def shift(self, points):
+        """Canvas coordinates -> layer image coordinates, for flat bbox lists or point lists"""
+        if points and isinstance(points[0], (tuple, list)):
+            return [(x - self.x, y - self.y) for x, y in points]
+        return [v - (self.x if i % 2 == 0 else self.y) for i, v in enumerate(points)]
+
+    def rotate(self, angle, center, resample=Image.BICUBIC):
+        """Same pixels as Image.rotate on the full canvas, computed only where they can be non-zero"""
+        out = clip_box(rotated_box(self.box, angle, center), self.width, self.height)
+        if out is None:
+            return Layer.blank((0, 0, 0, 0), self.width, self.height)
+        a, b, c, d, e, f = _rotation_matrix(angle, center)
+        # Output pixel (x, y) is canvas pixel (x + ox, y + oy); its source is read from
+        # this layer's image, whose origin sits at (self.x, self.y)
+        ox, oy = out[0], out[1]
+        c += a * ox + b * oy - self.x
+        f += d * ox + e * oy - self.y
+        size = (out[2] - ox, out[3] - oy)
+        image = self.image.transform(size, Image.AFFINE, (a, b, c, d, e, f), resample)
+        return Layer(image, ox, oy, self.width, self.height)
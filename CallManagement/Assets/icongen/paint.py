@@ -0,0 +1,38 @@
+"""
+Gradient definitions shared without NumPy
+
+Stop normalisation and the geometry of linear gradients, used by the spec
+parser, the raster backends (including the pure Python one), the SVG
+export and the NumPy gradient engine in icongen.gradient, so all of them
+agree on where a gradient starts and ends.
+"""
+
+import math
+
+GRADIENT_TYPES = ('linear', 'radial', 'conic')
+
+
+def normalize_stops(stops):
+    """Hashable ((offset, (r, g, b, a)), ...) with float offsets; RGB colours become opaque"""
+    return tuple((float(offset), tuple(int(c) for c in color) + (255,) * (4 - len(color)))
+                 for offset, color in stops)
+
+
+def css_line(angle, width, height):
+    """Start and end point of CSS linear-gradient(<angle>deg) across a width x height box.
+
+    0 points up, 90 right, and the line is just long enough to reach the box corners.
+    """
+    theta = math.radians(angle)
+    dx, dy = math.sin(theta), -math.cos(theta)
+    half = (abs(width * dx) + abs(height * dy)) / 2
+    cx, cy = width / 2, height / 2
+    return (cx - dx * half, cy - dy * half), (cx + dx * half, cy + dy * half)
+
+
+def linear_terms(start, end):
+    """(a, b, c) with gradient position = a * x + b * y + c along start -> end"""
+    (x1, y1), (x2, y2) = start, end
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = max(dx * dx + dy * dy, 1e-12)
+    return dx / length_sq, dy / length_sq, -(x1 * dx + y1 * dy) / length_sq
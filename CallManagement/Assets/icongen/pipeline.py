@@ -0,0 +1,812 @@
+"""
+Rendering pipeline for the Call Management app icon
+
+Renders the spec's layers, derives every size and writes the PNG, iconset,
+ICNS, ICO and SVG outputs. The command line lives in icongen.cli, which
+imports this module only for commands that render.
+"""
+
+from PIL import Image, ImageDraw
+import functools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from icongen import backends
+from icongen.backends import backend_for, rounded_rect_mask_array
+from icongen.cache import DEFAULT_MAX_MB, BuildCache, default_cache_dir
+from icongen.freedesktop import ARCHIVE_FORMATS, HICOLOR_SIZES, WINDOW_ICON_SIZE, hicolor_entries, write_archive
+from icongen.icns import ICNS_SIZES, entry_image, icns_bytes, read_icns
+from icongen.ico import PNG_MIN_SIZE, ico_bytes, read_ico
+from icongen.layers import KERNEL_PAD, Layer, bounding_box, clip_box, rotated_box, union_box
+from icongen.paint import css_line
+from icongen.png import EncodeOptions, PngWriter, encode_many, encode_png
+from icongen.pyramid import ResizePyramid
+from icongen.spec import ASSETS_DIR, DEFAULT_SPEC_PATH, IconSpec
+from icongen.vector import icon_svg, write_svg
+from icongen.watch import file_stamp, watch_files, write_preview_page
+
+# NumPy powers anti-aliasing, non-linear gradients and streaming; plain fills use icongen.backends
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Bump whenever a rendering change alters output, so cached stages are not reused
+RENDERER_VERSION = 4
+
+@functools.lru_cache(maxsize=None)
+def default_spec():
+    """The spec used when none is given"""
+    return IconSpec.from_file(DEFAULT_SPEC_PATH)
+
+def _css_gradient(size, stops, angle=135):
+    """CSS-style linear fill (135 is the default top-left to bottom-right), one table entry per diagonal"""
+    from icongen.gradient import Gradient
+
+    return Gradient.css_linear(stops, angle, size, size, resolution=2 * size)
+
+def _create_gradient_background_numpy(size, margin, radius, gradient):
+    """Whole-canvas NumPy fill of the gradient background"""
+    mask = rounded_rect_mask_array(size, margin, radius)
+
+    rgba = gradient.render(size, size)
+    rgba[~mask] = 0
+
+    return Image.frombuffer('RGBA', (size, size), rgba.tobytes(), 'raw', 'RGBA', 0, 1)
+
+def _create_gradient_background_linear(size, margin, radius, stops, angle):
+    """Linear fill cut to the rounded rect by the fastest fill_gradient/fill_mask backends"""
+    start, end = css_line(angle, size, size)
+    fill = backend_for('fill_gradient').fill_gradient(size, size, stops, start, end, 2 * size)
+    mask = backend_for('fill_mask').fill_mask(size, margin, radius)
+    return Image.composite(fill, Image.new('RGBA', (size, size), (0, 0, 0, 0)), mask)
+
+def _create_gradient_background_antialiased(size, margin, radius, gradient):
+    """Gradient background with fractional alpha along the rounded edges"""
+    from icongen import coverage
+
+    img = _create_gradient_background_numpy(size, 0, 0, gradient)
+    alpha = coverage.rounded_rect(size, size, (margin, margin, size - margin, size - margin), radius)
+    img.putalpha(Image.fromarray(np.rint(alpha * 255).astype(np.uint8), 'L'))
+    return img
+
+def create_gradient_background(size, margin, radius, antialias=False, stops=None, gradient=None, angle=135):
+    """Create a gradient background image.
+
+    Without gradient, stops run linearly at the CSS angle; gradient (an
+    icongen.gradient.Gradient, which needs NumPy) gives any other shape.
+    """
+    stops = stops or default_spec().gradient_stops
+    if antialias:
+        gradient = gradient or _css_gradient(size, stops, angle)
+        return _create_gradient_background_antialiased(size, margin, radius, gradient)
+    if gradient is not None:
+        return _create_gradient_background_numpy(size, margin, radius, gradient)
+    return _create_gradient_background_linear(size, margin, radius, stops, angle)
+
+def phone_geometry(size, spec=None):
+    """Shapes that make up the phone handset and signal waves at a given size"""
+    return (spec or default_spec()).geometry(size)
+
+def handset_source_box(size, geometry):
+    """Canvas box of the unrotated handset, padded for the rotation kernel"""
+    corners = [corner for bbox in geometry['handset_ellipses'] for corner in (bbox[:2], bbox[2:])]
+    return clip_box(bounding_box(corners + list(geometry['handset_bar']), KERNEL_PAD), size, size)
+
+def handset_box(size, geometry):
+    """Canvas box the rotated handset can cover"""
+    source = handset_source_box(size, geometry)
+    return clip_box(rotated_box(source, geometry['rotate'], geometry['center']), size, size)
+
+def waves_box(size, geometry):
+    """Canvas box the wave arcs and dot can cover"""
+    box = union_box(geometry['wave_arcs'] + [geometry['dot']])
+    return clip_box((box[0] - 1, box[1] - 1, box[2] + 2, box[3] + 2), size, size)
+
+def render_handset_layer(size, geometry, antialias=False):
+    """Rotated phone handset as a layer covering only its own box"""
+    if antialias:
+        # Evaluated in the handset's unrotated frame, so no rotate/resample pass is needed
+        box = handset_box(size, geometry)
+        image = Image.new('RGBA', (box[2] - box[0], box[3] - box[1]), geometry['handset_color'])
+        alpha = _handset_alpha(image.width, image.height, geometry, box[:2])
+        image.putalpha(Image.fromarray(alpha, 'L'))
+        return Layer(image, box[0], box[1], size, size)
+
+    # Draw on a layer just big enough for the handset instead of the whole canvas
+    layer = Layer.blank(handset_source_box(size, geometry), size, size)
+
+    # Phone as connected ellipses and a bar (the last ellipse smooths the joint),
+    # filled as one mask since every part has the same colour
+    *ends, joint = geometry['handset_ellipses']
+    shapes = ([('ellipse', layer.shift(bbox)) for bbox in ends]
+              + [('polygon', layer.shift(geometry['handset_bar'])), ('ellipse', layer.shift(joint))])
+    mask = backend_for('draw_path').draw_path(layer.image.size, shapes)
+    layer.image = Image.composite(Image.new('RGBA', layer.image.size, geometry['handset_color']), layer.image, mask)
+
+    # Rotate the phone icon (only the box it can reach is resampled)
+    return layer.rotate(geometry['rotate'], geometry['center'], Image.BICUBIC)
+
+def _handset_alpha(width, height, geometry, origin=(0, 0)):
+    """8-bit handset coverage of a width x height region of the canvas at origin"""
+    from icongen import coverage
+
+    xs, ys = coverage.pixel_grid(width, height, geometry['rotate'], geometry['center'], origin)
+    distance = coverage.polygon_distance(xs, ys, geometry['handset_bar'])
+    for bbox in geometry['handset_ellipses']:
+        distance = np.minimum(distance, coverage.ellipse_distance(xs, ys, bbox))
+    return np.rint(coverage.coverage_from_distance(distance) * 255).astype(np.uint8)
+
+def composite_handset(img, handset, antialias=False):
+    """Composite the handset layer onto the background, touching only the layer's box"""
+    if antialias:
+        from icongen import coverage
+
+        alpha = np.asarray(handset.image.getchannel('A'), dtype=np.float32) / 255
+        color = handset.image.getpixel((0, 0))[:3] + (255,)
+        img.paste(coverage.blend(img.crop(handset.box), alpha, color), handset.box[:2])
+        return img
+
+    return backend_for('composite').composite(img, handset.image, handset.image, handset.box[:2])
+
+def draw_waves(img, geometry, antialias=False):
+    """Draw the signal waves and their origin dot"""
+    if antialias:
+        from icongen import coverage
+
+        box = waves_box(img.width, geometry)
+        waves, dot = _wave_coverage(box[2] - box[0], box[3] - box[1], geometry, box[:2])
+        region = coverage.blend(img.crop(box), waves, geometry['wave_color'])
+        img.paste(coverage.blend(region, dot, geometry['dot_color']), box[:2])
+        return img
+
+    # Quarter circles
+    draw = ImageDraw.Draw(img)
+    for bbox in geometry['wave_arcs']:
+        draw.arc(bbox, start=geometry['wave_start'], end=geometry['wave_end'],
+                 fill=geometry['wave_color'], width=geometry['wave_width'])
+
+    # Small dot at the origin of waves
+    draw.ellipse(geometry['dot'], fill=geometry['dot_color'])
+    return img
+
+def _wave_coverage(width, height, geometry, origin=(0, 0)):
+    """Coverage of the wave arcs and of the dot over a region of the canvas at origin"""
+    from icongen import coverage
+
+    xs, ys = coverage.pixel_grid(width, height, origin=origin)
+    distance = np.min([
+        coverage.arc_distance(xs, ys, bbox, geometry['wave_start'], geometry['wave_end'],
+                              geometry['wave_width'])
+        for bbox in geometry['wave_arcs']
+    ], axis=0)
+    dot = coverage.ellipse_distance(xs, ys, geometry['dot'])
+    return coverage.coverage_from_distance(distance), coverage.coverage_from_distance(dot)
+
+def draw_phone_icon(img, size, antialias=False, spec=None):
+    """Draw a phone handset icon"""
+    geometry = phone_geometry(size, spec)
+    handset = render_handset_layer(size, geometry, antialias)
+    img = composite_handset(img, handset, antialias)
+    return draw_waves(img, geometry, antialias)
+
+def handset_params(geometry):
+    """The part of the geometry the handset layer depends on"""
+    keys = ('center', 'rotate', 'handset_color', 'handset_ellipses', 'handset_bar')
+    return {key: geometry[key] for key in keys}
+
+def create_icon(antialias=False, size=1024, verbose=True, cache=None, spec=None):
+    """Create the main icon"""
+    cache = cache or BuildCache()
+    spec = spec or default_spec()
+    margin, radius = spec.layout(size)
+    geometry = phone_geometry(size, spec)
+    stops = spec.gradient_stops
+    shape = spec.gradient_shape
+    if shape['type'] == 'linear':
+        # Linear fills go through the raster backends, which work without NumPy
+        gradient, angle = None, shape['angle']
+    elif HAS_NUMPY:
+        gradient, angle = spec.gradient(size), None
+    else:
+        raise ValueError(f"{shape['type']} gradients need NumPy")
+    
+    # Create gradient background (a colour-only change re-renders just this layer)
+    def background():
+        if verbose:
+            print("Creating gradient background...")
+        return create_gradient_background(size, margin, radius, antialias, stops, gradient, angle)
+    key = cache.key('background', size, margin, radius, stops, spec.gradient_shape, antialias, backends.key_data())
+    img = cache.image(key, background, keep=True).copy()
+    
+    # Remaining layers in spec order
+    for layer in spec.layers[1:]:
+        if layer['type'] == 'handset':
+            def handset():
+                if verbose:
+                    print("Drawing phone icon...")
+                return render_handset_layer(size, geometry, antialias).image
+            # Only the layer's box is cached; its position follows from the geometry
+            box = handset_box(size, geometry)
+            key = cache.key('handset', size, handset_params(geometry), antialias, box, backends.key_data())
+            handset_layer = Layer(cache.image(key, handset, keep=True), box[0], box[1], size, size)
+            img = composite_handset(img, handset_layer, antialias)
+        elif layer['type'] == 'waves':
+            img = draw_waves(img, geometry, antialias)
+    
+    return img
+
+def _render_native(size, antialias, spec, choice):
+    """Process pool worker: render one size straight from the geometry"""
+    # Reuse the parent's backend choice instead of benchmarking in every worker
+    backends.use(choice)
+    return create_icon(antialias, size, verbose=False, spec=spec)
+
+def render_native_sizes(sizes, antialias=False, spec=None, pool=None):
+    """Render every size natively, spreading the sizes across CPU cores.
+
+    Pass a pool to share workers across several builds (e.g. batch variants).
+    """
+    sizes = sorted(set(sizes), reverse=True)
+    spec = spec or default_spec()
+    if pool is None:
+        with ProcessPoolExecutor() as own_pool:
+            return render_native_sizes(sizes, antialias, spec, own_pool)
+    choice = backends.select()
+    images = pool.map(_render_native, sizes, [antialias] * len(sizes), [spec] * len(sizes), [choice] * len(sizes))
+    return dict(zip(sizes, images))
+
+# Rows rendered at a time when streaming; peak memory is O(size * STRIP_HEIGHT)
+STRIP_HEIGHT = 64
+
+def render_strip(size, top, height, spec=None):
+    """Rows top..top + height of the anti-aliased icon as a (height, size, 4) uint8 array.
+
+    Every layer is evaluated per pixel, so the strips of a canvas match
+    create_icon(antialias=True) exactly without any full-canvas buffer.
+    """
+    from icongen import coverage
+
+    spec = spec or default_spec()
+    margin, radius = spec.layout(size)
+    geometry = phone_geometry(size, spec)
+    origin = (0, top)
+
+    rgba = spec.gradient(size).render(size, height, origin=origin)
+    xs, ys = coverage.pixel_grid(size, height, origin=origin)
+    box = (margin, margin, size - margin, size - margin)
+    alpha = coverage.coverage_from_distance(coverage.rounded_rect_distance(xs, ys, box, radius))
+    rgba[..., 3] = np.rint(alpha * 255).astype(np.uint8)
+
+    # Layers are only evaluated where their box overlaps the strip
+    for layer in spec.layers[1:]:
+        box = handset_box(size, geometry) if layer['type'] == 'handset' else waves_box(size, geometry)
+        x1, y1, x2, y2 = box
+        y1, y2 = max(y1, top), min(y2, top + height)
+        if y1 >= y2:
+            continue
+        region = rgba[y1 - top:y2 - top, x1:x2]
+        if layer['type'] == 'handset':
+            alpha = _handset_alpha(x2 - x1, y2 - y1, geometry, (x1, y1)).astype(np.float32) / 255
+            region = coverage.blend_array(region, alpha, geometry['handset_color'][:3] + (255,))
+        else:
+            waves, dot = _wave_coverage(x2 - x1, y2 - y1, geometry, (x1, y1))
+            region = coverage.blend_array(region, waves, geometry['wave_color'])
+            region = coverage.blend_array(region, dot, geometry['dot_color'])
+        rgba[y1 - top:y2 - top, x1:x2] = region
+    return rgba
+
+def stream_icon_png(path, size, spec=None, strip_height=STRIP_HEIGHT, options=None):
+    """Render a size x size master strip by strip straight into a PNG file"""
+    with open(path, 'wb') as f:
+        writer = PngWriter(f, size, size, options=options)
+        for top in range(0, size, strip_height):
+            height = min(strip_height, size - top)
+            writer.write_rows(render_strip(size, top, height, spec).reshape(height, -1))
+        writer.close()
+    return path
+
+# Required sizes for macOS
+ICONSET_SIZES = [
+    (16, 1), (16, 2),
+    (32, 1), (32, 2),
+    (128, 1), (128, 2),
+    (256, 1), (256, 2),
+    (512, 1), (512, 2),
+]
+
+ICO_SIZES = [16, 32, 48, 64, 128, 256]
+
+# Every level a full export uses, planned up front so the resize cascade does not depend on the targets
+BUILD_SIZES = [size * scale for size, scale in ICONSET_SIZES] + ICO_SIZES + HICOLOR_SIZES
+
+class IconBuild:
+    """Icon outputs for one set of parameters, resolved lazily through the build cache.
+
+    Each stage is keyed on its inputs, so on a no-op rebuild every output is
+    read straight from the cache and nothing is rendered or resampled.
+    """
+    
+    def __init__(self, sizes, antialias=False, native=False, cache=None, spec=None, pool=None,
+                 encode_options=None, encode_threads=None):
+        self.sizes = sorted(set(sizes) | {1024}, reverse=True)
+        self.antialias = antialias
+        self.native = native
+        self.cache = cache or BuildCache()
+        self.spec = spec or default_spec()
+        self.pool = pool
+        self.encode_options = encode_options or EncodeOptions()
+        self.encode_threads = encode_threads
+        self._master = None
+        self._pyramid = None
+        self._native = None
+        self._png = {}
+        # size -> EncodeResult for PNGs encoded (not read from cache) in this build
+        self.encode_report = {}
+        
+        # Includes forced non-conforming backends, which change the pixels of every level
+        self.master_key = self.cache.key('master', self.spec.key_data(), antialias, backends.key_data())
+    
+    def level_key(self, size):
+        """Key of the raster at size; the 1024 level is the master itself"""
+        if size == 1024:
+            return self.master_key
+        method = 'native' if self.native else 'lanczos-cascade'
+        return self.cache.key('level', self.master_key, size, method)
+    
+    def master(self):
+        if self._master is None:
+            self._master = self.cache.image(
+                self.master_key, lambda: create_icon(self.antialias, cache=self.cache, spec=self.spec))
+        return self._master
+    
+    def level(self, size):
+        if size == 1024:
+            return self.master()
+        return self.cache.image(self.level_key(size), lambda: self._render_level(size))
+    
+    def _render_level(self, size):
+        if self.native:
+            # First miss renders every size in one pool round
+            if self._native is None:
+                pending = [s for s in self.sizes if s != 1024]
+                print(f"Rendering {len(pending)} sizes natively...")
+                self._native = render_native_sizes(pending, self.antialias, self.spec, self.pool)
+            return self._native[size]
+        return self.pyramid()[size]
+    
+    def pyramid(self):
+        if self._pyramid is None:
+            self._pyramid = ResizePyramid(self.master(), self.sizes, resize=backend_for('resize').resize)
+        return self._pyramid
+    
+    def from_master(self, size):
+        """Whether the level at size is the master or resized straight from it, not down the cascade"""
+        if size == 1024:
+            return True
+        return not self.native and self.pyramid().source_size(size) == 1024
+    
+    def png_key(self, size):
+        return self.cache.key('png', self.level_key(size), self.encode_options.key_data())
+    
+    def png(self, size):
+        """Encoded PNG bytes of the level at size"""
+        return self.encode_pngs([size])[size]
+    
+    def encode_pngs(self, sizes):
+        """PNG bytes for each size, encoding every cache miss concurrently"""
+        missing = []
+        for size in sorted(set(sizes), reverse=True):
+            if size not in self._png:
+                data = self.cache.lookup(self.png_key(size))
+                if data is None:
+                    missing.append(size)
+                else:
+                    self._png[size] = data
+        if missing:
+            # Resolve levels up front: the pyramid is built lazily and is not thread-safe
+            images = {size: self.level(size) for size in missing}
+            results = encode_many(images, self.encode_options, self.encode_threads)
+            for size, result in results.items():
+                self.cache.store(self.png_key(size), result.data)
+                self._png[size] = result.data
+                self.encode_report[size] = result
+        return {size: self._png[size] for size in sizes}
+    
+    def icns(self):
+        key = self.cache.key('icns', [self.png_key(s) for s in ICNS_SIZES])
+        return self.cache.data(key, lambda: icns_bytes(self.encode_pngs(ICNS_SIZES)))
+    
+    def ico(self):
+        key = self.cache.key('ico', [self.level_key(s) for s in ICO_SIZES], self.encode_options.key_data())
+        return self.cache.data(key, self._encode_ico)
+    
+    def _encode_ico(self):
+        images = {size: self.level(size) for size in ICO_SIZES}
+        if not self.encode_options.palette:
+            # The 256 px entry is the same RGBA PNG the iconset already encoded
+            images.update(self.encode_pngs([s for s in ICO_SIZES if s >= PNG_MIN_SIZE]))
+        return ico_bytes(images, self.encode_options)
+
+def write_file(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def create_iconset(build, output_dir):
+    """Create all required sizes for macOS iconset"""
+    iconset_dir = os.path.join(output_dir, "AppIcon.iconset")
+    os.makedirs(iconset_dir, exist_ok=True)
+    
+    for size, scale in ICONSET_SIZES:
+        actual_size = size * scale
+        
+        if scale == 1:
+            filename = f"icon_{size}x{size}.png"
+        else:
+            filename = f"icon_{size}x{size}@2x.png"
+        
+        write_file(os.path.join(iconset_dir, filename), build.png(actual_size))
+        print(f"Created: {filename}")
+    
+    return iconset_dir
+
+def print_encode_report(build, files):
+    """Bytes and encode time per written PNG (file name, size) pair"""
+    print("\nPNG encode report:")
+    total_bytes = 0
+    for filename, size in files:
+        data = build.png(size)
+        total_bytes += len(data)
+        result = build.encode_report.get(size)
+        if result is None:
+            timing = "cached"
+        else:
+            timing = f"{result.seconds * 1000:7.1f} ms, {len(data) / result.raw_size:6.1%} of raw"
+        print(f"   {filename:<24} {len(data):>9,} bytes  {timing}")
+    # Files sharing a size share one encode, so time is summed per size
+    total_seconds = sum(result.seconds for result in build.encode_report.values())
+    print(f"   {'total':<24} {total_bytes:>9,} bytes  {total_seconds * 1000:7.1f} ms encoding")
+
+# Written when no targets are selected; SVG is opt-in since the rasters are the shipped assets
+DEFAULT_TARGETS = ('render', 'iconset', 'icns', 'ico')
+
+TARGET_LABELS = {'render': 'PNG', 'iconset': 'Iconset', 'icns': 'ICNS', 'ico': 'ICO', 'svg': 'SVG',
+                 'linux': 'Linux bundle'}
+
+def iconset_files():
+    """(file name, pixel size) of every PNG in AppIcon.iconset"""
+    return [(f"icon_{size}x{size}{'@2x' if scale == 2 else ''}.png", size * scale)
+            for size, scale in ICONSET_SIZES]
+
+def write_linux_bundle(build, output_dir, archive_format='tar'):
+    """Archive the hicolor tree, scalable SVG and window icon, all from the build's PNGs"""
+    extension, _ = ARCHIVE_FORMATS[archive_format]
+    archive_path = os.path.join(output_dir, f"AppIcon-linux{extension}")
+    try:
+        svg = icon_svg(build.spec)
+    except ValueError as e:
+        # Conic gradients have no SVG form; the PNG sizes still cover every hicolor slot
+        print(f"Skipping scalable icon: {e}")
+        svg = None
+    pngs = build.encode_pngs(HICOLOR_SIZES + [WINDOW_ICON_SIZE])
+    write_archive(archive_path, hicolor_entries(pngs, svg), archive_format)
+    print(f"Created: {archive_path}")
+    return archive_path
+
+def export_icons(build, output_dir, targets=DEFAULT_TARGETS, archive_format='tar'):
+    """Write the selected outputs for one build into output_dir.
+
+    Only the levels and PNGs those targets need are rendered and encoded.
+    Returns a mapping of target -> path written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    
+    # Encode every PNG the export needs in one parallel round
+    files = []
+    if 'render' in targets:
+        files.append(("AppIcon_1024.png", 1024))
+    if 'iconset' in targets:
+        files.extend(iconset_files())
+    sizes = [size for _, size in files]
+    if 'icns' in targets:
+        sizes.extend(ICNS_SIZES)
+    if 'linux' in targets:
+        sizes.extend(HICOLOR_SIZES + [WINDOW_ICON_SIZE])
+    build.encode_pngs(sizes)
+    
+    # Save as PNG
+    if 'render' in targets:
+        paths['render'] = os.path.join(output_dir, "AppIcon_1024.png")
+        write_file(paths['render'], build.png(1024))
+        print(f"Saved: {paths['render']}")
+    
+    # Create iconset
+    if 'iconset' in targets:
+        paths['iconset'] = create_iconset(build, output_dir)
+    
+    # Pack the already-encoded iconset PNGs into the icns container
+    if 'icns' in targets:
+        paths['icns'] = os.path.join(output_dir, "AppIcon.icns")
+        write_file(paths['icns'], build.icns())
+        print(f"Created: {paths['icns']}")
+    
+    # Also create ICO for Windows
+    if 'ico' in targets:
+        ico_path = os.path.join(output_dir, "AppIcon.ico")
+        try:
+            write_file(ico_path, build.ico())
+            paths['ico'] = ico_path
+            print(f"Created: {ico_path}")
+        except Exception as e:
+            print(f"Error creating ICO: {e}")
+    
+    # Vector export straight from the spec; nothing is rasterized
+    if 'svg' in targets:
+        paths['svg'] = write_svg(build.spec, output_dir)
+    
+    # Linux packaging takes one archive; the shared sizes reuse the iconset's encodes
+    if 'linux' in targets:
+        paths['linux'] = write_linux_bundle(build, output_dir, archive_format)
+    
+    if files:
+        print_encode_report(build, files)
+    
+    return paths
+
+# Committed containers, checked entry by entry: whatever sizes the file holds are compared
+GOLDEN_CONTAINERS = ["AppIcon.ico", "AppIcon.icns"]
+
+def golden_files():
+    """(path relative to the asset directory, pixel size) of every committed PNG output"""
+    return [("AppIcon_1024.png", 1024)] + [
+        (os.path.join("AppIcon.iconset", name), size) for name, size in iconset_files()
+    ]
+
+def container_entries(path):
+    """(entry name, RGBA image) for every image inside a committed .ico or .icns"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith('.ico'):
+        return [(str(size), img) for size, img in sorted(read_ico(data).items())]
+    entries = ((ostype.decode('ascii'), entry_image(ostype, payload)) for ostype, payload in read_icns(data).items())
+    return [(name, img) for name, img in entries if img is not None]
+
+def golden_images(asset_dir):
+    """(label, committed RGBA image or None when missing) for every committed raster and container entry"""
+    for name, _ in golden_files():
+        path = os.path.join(asset_dir, name)
+        if not os.path.exists(path):
+            yield name, None
+            continue
+        with Image.open(path) as img:
+            yield name, img.convert('RGBA')
+    for name in GOLDEN_CONTAINERS:
+        path = os.path.join(asset_dir, name)
+        if not os.path.exists(path):
+            yield name, None
+            continue
+        for entry, img in container_entries(path):
+            yield f"{name} [{entry}]", img
+
+def verify_outputs(build, asset_dir, tolerance=None, diff_dir=None):
+    """Compare the build's rasters, rendered in memory, with the committed assets.
+
+    tolerance applies to levels resampled down the cascade, whose filters
+    drift slightly between versions; the master and levels resized straight
+    from it must match exactly. Returns True when every file is within its
+    tolerance. For each file that is not, a heatmap of the differences is
+    written to diff_dir.
+    """
+    from icongen.verify import EXACT, Tolerance, compare, diff_heatmap
+    
+    tolerance = tolerance or Tolerance()
+    passed = True
+    for name, expected in golden_images(asset_dir):
+        if expected is None:
+            print(f"MISSING {name}")
+            passed = False
+            continue
+        if expected.width not in BUILD_SIZES or expected.width != expected.height:
+            print(f"FAIL {name:<36} {expected.width}x{expected.height} is not a size the build renders")
+            passed = False
+            continue
+        result = compare(name, expected, build.level(expected.width))
+        ok = result.passes(EXACT if build.from_master(expected.width) else tolerance)
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<36} {result.describe()}")
+        if ok:
+            continue
+        passed = False
+        if diff_dir and result.error_map is not None:
+            # "AppIcon.ico [16]" -> AppIcon_ico_16_diff.png
+            stem = os.path.basename(name).replace('.png', '').replace('.', '_').replace(' [', '_').rstrip(']')
+            heatmap_path = os.path.join(diff_dir, f"{stem}_diff.png")
+            os.makedirs(diff_dir, exist_ok=True)
+            write_file(heatmap_path, encode_png(diff_heatmap(expected, result), PREVIEW_ENCODE_OPTIONS))
+            print(f"     heatmap: {heatmap_path}")
+    return passed
+
+def run_batch(spec_paths, output_root, antialias=False, native=False, cache=None, encode_options=None,
+              targets=DEFAULT_TARGETS, archive_format='tar'):
+    """Render several variant specs in one process.
+
+    Variants share parsed specs, the cached rounded-rect masks, layer renders
+    with identical inputs and a single worker pool for native renders.
+    """
+    specs = [IconSpec.from_file(path) for path in spec_paths]
+    names = [spec.name for spec in specs]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"variant names must be unique, got duplicates: {sorted(duplicates)}")
+    
+    pool = ProcessPoolExecutor() if native else None
+    try:
+        for spec in specs:
+            print(f"\n== {spec.name} ==")
+            build = IconBuild(BUILD_SIZES, antialias, native, cache, spec, pool, encode_options)
+            export_icons(build, os.path.join(output_root, spec.name), targets, archive_format)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return names
+
+# Fast settings for the watch preview: it is rewritten on every edit
+PREVIEW_ENCODE_OPTIONS = EncodeOptions(level=1, filter='sub')
+
+WATCH_PNG = "icon_watch.png"
+WATCH_PAGE = "icon_watch.html"
+
+def _restart_command():
+    """Command line that starts this process again the same way (python -m icongen or a script)"""
+    if hasattr(sys, 'orig_argv'):
+        return [sys.executable] + sys.orig_argv[1:]
+    main_spec = getattr(sys.modules['__main__'], '__spec__', None)
+    if main_spec is not None:
+        return [sys.executable, '-m', main_spec.name.removesuffix('.__main__')] + sys.argv[1:]
+    return [sys.executable] + sys.argv
+
+def watch(spec_path, output_dir, antialias=False, cache=None, preview_size=512, interval=0.2,
+          cache_bytes=DEFAULT_MAX_MB << 20):
+    """Re-render a preview whenever the spec changes, until interrupted.
+
+    The process stays warm, and layers are kept in memory by their inputs, so
+    an edit re-renders only the layers it touches (moving the waves keeps the
+    background and handset). An edit to this module restarts the watcher.
+    Each edit adds layers to the disk cache, so it is pruned after every render.
+    """
+    cache = cache or BuildCache(version=RENDERER_VERSION)
+    script = os.path.abspath(__file__)
+    # Not icon_preview.html: create_icon.py writes a static page under that name
+    png_path = os.path.join(output_dir, WATCH_PNG)
+    html_path = os.path.join(output_dir, WATCH_PAGE)
+    page_written = False
+    os.makedirs(output_dir, exist_ok=True)
+    script_stamp = file_stamp(script)
+    print(f"Watching {spec_path} (Ctrl+C to stop)")
+    try:
+        for _ in watch_files([spec_path, script], interval):
+            if file_stamp(script) != script_stamp:
+                print("Pipeline changed, restarting...")
+                os.execv(sys.executable, _restart_command())
+            start = time.perf_counter()
+            try:
+                spec = IconSpec.from_file(spec_path)
+                img = create_icon(antialias, preview_size, verbose=False, cache=cache, spec=spec)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # Keep watching: the next save usually fixes a half-typed spec
+                print(f"Spec error: {e}")
+                continue
+            write_file(png_path, encode_png(img, PREVIEW_ENCODE_OPTIONS))
+            cache.prune(cache_bytes)
+            if not page_written:
+                # Rewritten once per session, so a page left by an older run never lingers
+                write_preview_page(html_path, WATCH_PNG, spec.name)
+                page_written = True
+                print(f"Preview page: {html_path}")
+            print(f"Rendered {os.path.basename(png_path)} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+def print_backends():
+    """Benchmark table of every raster backend per operation, with the automatic choice"""
+    choice = backends.select()
+    print(f"Available backends: {', '.join(sorted(backends.probe()))}")
+    for operation in backends.OPERATIONS:
+        timings = backends.benchmark(operation)
+        cells = [f"{name} {'differs' if t is None else f'{t * 1000:.2f} ms'}" for name, t in timings.items()]
+        print(f"  {operation:<14} -> {choice[operation]:<7} ({', '.join(cells)})")
+
+# Stages wrapped in spans by --profile; nothing is wrapped otherwise
+PROFILED_FUNCTIONS = [
+    'create_icon', 'create_gradient_background', 'render_handset_layer', 'composite_handset',
+    'draw_waves', 'render_native_sizes', 'create_iconset', 'export_icons',
+    'write_file', 'write_svg', 'write_linux_bundle', 'run_batch', 'stream_icon_png', 'verify_outputs',
+]
+PROFILED_BUILD_METHODS = ['master', 'level', 'encode_pngs', 'icns', 'ico']
+
+def enable_profiling():
+    """Wrap the pipeline stages of this module in profiler spans"""
+    from icongen.profile import Profiler
+
+    profiler = Profiler()
+    profiler.instrument(sys.modules[__name__], PROFILED_FUNCTIONS)
+    profiler.instrument(IconBuild, PROFILED_BUILD_METHODS)
+    profiler.instrument(ResizePyramid, ['__getitem__'], {'__getitem__': lambda pyramid, size: f"resize {size}"})
+    return profiler
+
+def run(args):
+    """Build the outputs selected by the parsed command line (see icongen.cli)"""
+    encode_options = EncodeOptions(args.png_level, args.png_filter, args.png_strategy, args.palette)
+    
+    output_dir = args.out or ASSETS_DIR
+    cache = BuildCache(None if args.no_cache else args.cache_dir or default_cache_dir(), RENDERER_VERSION)
+    targets = args.targets or DEFAULT_TARGETS
+    cache_bytes = (args.cache_size or DEFAULT_MAX_MB) << 20
+    
+    if args.clean_cache:
+        removed, freed = BuildCache(args.cache_dir or default_cache_dir()).clear()
+        print(f"Removed {removed} cache entries ({freed / (1 << 20):.1f} MB)")
+        return
+    
+    if args.list_backends:
+        print_backends()
+        return
+    
+    if set(targets) == {'svg'} and not (args.verify or args.watch or args.stream or args.batch):
+        # Nothing to rasterize, so skip backend selection as well
+        write_svg(IconSpec.from_file(args.spec), output_dir)
+        return
+    
+    # Decide once per run; --native workers are handed the same choice
+    backends.use(backends.select(cache, None if args.backend == 'auto' else args.backend))
+    
+    if args.verify:
+        from icongen.verify import Tolerance
+        
+        # Always render from scratch: the cache would hide a changed renderer
+        start = time.perf_counter()
+        build = IconBuild(BUILD_SIZES, args.antialias, args.native, BuildCache(version=RENDERER_VERSION),
+                          IconSpec.from_file(args.spec))
+        tolerance = Tolerance(args.verify_max_error, args.verify_mean_error, args.verify_hash_distance)
+        passed = verify_outputs(build, ASSETS_DIR, tolerance, os.path.join(output_dir, "verify_diff"))
+        print(f"\n{'✅ Outputs match' if passed else '❌ Outputs differ from'} the committed assets "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+        if not passed:
+            sys.exit(1)
+        return
+    
+    if args.watch:
+        watch(args.spec, output_dir, args.antialias, cache, args.preview_size, cache_bytes=cache_bytes)
+        return
+    
+    if args.stream:
+        # Streamed masters skip the cache: holding them whole is what streaming avoids
+        spec = IconSpec.from_file(args.spec)
+        os.makedirs(output_dir, exist_ok=True)
+        for size in args.stream:
+            path = os.path.join(output_dir, f"AppIcon_{size}.png")
+            stream_icon_png(path, size, spec, args.strip_height or STRIP_HEIGHT, encode_options)
+            print(f"Streamed: {path}")
+        return
+    
+    if args.batch:
+        names = run_batch(args.batch, output_dir, args.antialias, args.native, cache, encode_options, targets,
+                          args.archive_format)
+        cache.prune(cache_bytes)
+        print(f"\n✅ Rendered {len(names)} variants into {output_dir}")
+        return
+    
+    # Always plan every size so a single target resamples each level exactly as a full export does
+    build = IconBuild(BUILD_SIZES, args.antialias, args.native, cache, IconSpec.from_file(args.spec),
+                      encode_options=encode_options, encode_threads=args.encode_threads)
+    paths = export_icons(build, output_dir, targets, args.archive_format)
+    cache.prune(cache_bytes)
+    
+    print("\n✅ Icon creation complete!")
+    for target, path in paths.items():
+        print(f"   {TARGET_LABELS[target]}: {path}")
+    if cache.enabled:
+        print(f"   Cache: {cache.hits} hits, {cache.misses} misses ({cache.root})")
@@ -0,0 +1,288 @@
+"""
+PNG encode stage with explicit compression settings
+
+Writes only the chunks needed to decode the image (IHDR, PLTE, tRNS, IDAT,
+IEND), so output is byte-for-byte deterministic: no timestamps, gamma or
+text metadata. The zlib level, deflate strategy and scanline filter are
+selectable, RGBA images can be reduced losslessly to RGB or a palette, and
+encode_many() runs several encodes on threads (zlib releases the GIL).
+"""
+
+import io
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Bump when encoder changes alter output bytes, so cached encodes are not reused
+ENCODER_VERSION = 2
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+FILTERS = {'none': 0, 'sub': 1, 'up': 2, 'average': 3, 'paeth': 4, 'adaptive': None}
+
+STRATEGIES = {
+    'default': zlib.Z_DEFAULT_STRATEGY,
+    'filtered': zlib.Z_FILTERED,
+    'huffman': zlib.Z_HUFFMAN_ONLY,
+    'rle': zlib.Z_RLE,
+    'fixed': zlib.Z_FIXED,
+}
+
+# Colour types from the PNG spec
+COLOR_RGB = 2
+COLOR_PALETTE = 3
+COLOR_RGBA = 6
+
+# Compressed bytes buffered per IDAT chunk when streaming
+IDAT_CHUNK_SIZE = 1 << 16
+
+# Rows filtered at a time; keeps the filter's temporaries to a few hundred KB at 1024 px
+FILTER_BLOCK_ROWS = 32
+
+
+class EncodeOptions:
+    """Compression settings for the encode stage"""
+
+    # Z_FILTERED, as libpng uses for filtered rows: smaller and faster than the default here
+    def __init__(self, level=9, filter='adaptive', strategy='filtered', palette=False):
+        if not 0 <= level <= 9:
+            raise ValueError(f"zlib level must be 0-9, got {level}")
+        if filter not in FILTERS:
+            raise ValueError(f"unknown PNG filter {filter!r}, expected one of {sorted(FILTERS)}")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown zlib strategy {strategy!r}, expected one of {sorted(STRATEGIES)}")
+        self.level = level
+        self.filter = filter
+        self.strategy = strategy
+        self.palette = palette
+
+    def key_data(self):
+        """Everything that affects the encoded bytes, for cache keys"""
+        return {'version': ENCODER_VERSION, 'level': self.level, 'filter': self.filter,
+                'strategy': self.strategy, 'palette': self.palette}
+
+
+class EncodeResult:
+    """Encoded bytes plus timing for the size report"""
+
+    def __init__(self, data, seconds, raw_size):
+        self.data = data
+        self.seconds = seconds
+        self.raw_size = raw_size
+
+
+def _chunk(kind, data):
+    return (struct.pack('>I', len(data)) + kind + data
+            + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+
+class PngWriter:
+    """Row-oriented PNG writer.
+
+    Rows are filtered and compressed as they arrive, so an image can be
+    streamed to a file strip by strip without ever holding it whole.
+    """
+
+    def __init__(self, out, width, height, color_type=COLOR_RGBA, bit_depth=8,
+                 palette=None, transparency=None, options=None):
+        self.out = out
+        self.width = width
+        self.height = height
+        self.options = options or EncodeOptions()
+        channels = {COLOR_RGB: 3, COLOR_PALETTE: 1, COLOR_RGBA: 4}[color_type]
+        # Filters work on whole bytes; for sub-byte depths this rounds up to one
+        self.bpp = max(1, channels * bit_depth // 8)
+        self.row_bytes = (width * channels * bit_depth + 7) // 8
+        self.rows_written = 0
+        self._previous = bytes(self.row_bytes)
+        self._compressor = zlib.compressobj(self.options.level, zlib.DEFLATED, 15, 9,
+                                            STRATEGIES[self.options.strategy])
+        self._pending = []
+        self._pending_size = 0
+
+        out.write(PNG_SIGNATURE)
+        out.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, bit_depth, color_type, 0, 0, 0)))
+        if palette is not None:
+            out.write(_chunk(b'PLTE', palette))
+        if transparency:
+            out.write(_chunk(b'tRNS', transparency))
+
+    def write_rows(self, rows):
+        """Append scanlines: a (n, row_bytes) uint8 array or an iterable of bytes"""
+        if HAS_NUMPY:
+            rows = np.asarray(rows, dtype=np.uint8).reshape(-1, self.row_bytes)
+            for top in range(0, len(rows), FILTER_BLOCK_ROWS):
+                block = rows[top:top + FILTER_BLOCK_ROWS]
+                previous = np.frombuffer(self._previous, dtype=np.uint8)
+                filtered = filter_rows(block, previous, self.bpp, self.options.filter)
+                self._previous = block[-1].tobytes()
+                self._emit(filtered.tobytes(), len(block))
+        else:
+            # Without NumPy only the unfiltered form is available
+            data = b''.join(b'\x00' + bytes(row) for row in rows)
+            self._emit(data, len(data) // (self.row_bytes + 1))
+
+    def _emit(self, data, row_count):
+        self.rows_written += row_count
+        compressed = self._compressor.compress(data)
+        self._pending.append(compressed)
+        self._pending_size += len(compressed)
+        if self._pending_size >= IDAT_CHUNK_SIZE:
+            self._flush_idat()
+
+    def _flush_idat(self):
+        data = b''.join(self._pending)
+        if data:
+            self.out.write(_chunk(b'IDAT', data))
+        self._pending = []
+        self._pending_size = 0
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"wrote {self.rows_written} rows, image has {self.height}")
+        self._pending.append(self._compressor.flush())
+        self._flush_idat()
+        self.out.write(_chunk(b'IEND', b''))
+
+
+def _paeth(left, up, upper_left):
+    a, b, c = (x.astype(np.int16) for x in (left, up, upper_left))
+    # Distances of p = a + b - c to a, b and c
+    pa, pb, pc = np.abs(b - c), np.abs(a - c), np.abs(a + b - 2 * c)
+    return np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upper_left))
+
+
+def _signed_cost(residual):
+    """Per-row sum of |residual| with each byte read as a signed value"""
+    # In uint8, -x wraps to 256 - x, so the smaller of the two is |signed byte|
+    return np.minimum(residual, np.negative(residual)).sum(axis=1, dtype=np.uint32)
+
+
+def filter_rows(rows, previous, bpp, method):
+    """Apply a PNG scanline filter to every row, each prefixed with its type byte.
+
+    'adaptive' picks the filter with the smallest sum of absolute signed
+    residuals per row (the heuristic libpng uses). Residuals wrap in uint8,
+    and candidates are scored one at a time, so temporaries stay at the
+    size of rows.
+    """
+    up = np.vstack([previous[None, :], rows[:-1]])
+    left = np.zeros_like(rows)
+    left[:, bpp:] = rows[:, :-bpp]
+    upper_left = np.zeros_like(rows)
+    upper_left[:, bpp:] = up[:, :-bpp]
+
+    predictors = {
+        0: lambda: None,
+        1: lambda: left,
+        2: lambda: up,
+        3: lambda: ((left.astype(np.uint16) + up) >> 1).astype(np.uint8),
+        4: lambda: _paeth(left, up, upper_left),
+    }
+
+    def residual(kind):
+        predicted = predictors[kind]()
+        return rows if predicted is None else rows - predicted
+
+    out = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+    if method != 'adaptive':
+        out[:, 0] = FILTERS[method]
+        out[:, 1:] = residual(FILTERS[method])
+        return out
+
+    best_cost = None
+    for kind in range(5):
+        candidate = residual(kind)
+        cost = _signed_cost(candidate)
+        if best_cost is None:
+            best_cost = cost
+            out[:, 0] = kind
+            out[:, 1:] = candidate
+            continue
+        # Strictly smaller, so ties keep the lower filter type
+        better = cost < best_cost
+        best_cost = np.where(better, cost, best_cost)
+        out[better, 0] = kind
+        out[better, 1:] = candidate[better]
+    return out
+
+
+def _reduce(pixels):
+    """Lossless colour-type reduction of an (h, w, 4) RGBA array.
+
+    Returns (color_type, bit_depth, rows, palette, transparency).
+    """
+    height, width, _ = pixels.shape
+    packed = pixels.reshape(-1, 4).view(np.uint32).ravel()
+    colors, index = np.unique(packed, return_inverse=True)
+    if len(colors) <= 256:
+        rgba = colors.view(np.uint8).reshape(-1, 4)
+        # Fewer colours allow smaller indices; pack them into whole bytes
+        bit_depth = next(depth for depth in (1, 2, 4, 8) if len(colors) <= 1 << depth)
+        index = index.reshape(height, width).astype(np.uint8)
+        if bit_depth < 8:
+            per_byte = 8 // bit_depth
+            padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+            padded[:, :width] = index
+            groups = padded.reshape(height, -1, per_byte)
+            shifts = (8 - bit_depth * (np.arange(per_byte) + 1)).astype(np.uint8)
+            index = np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+        alpha = rgba[:, 3]
+        # tRNS can stop at the last non-opaque entry
+        opaque_tail = np.nonzero(alpha != 255)[0]
+        transparency = alpha[:opaque_tail[-1] + 1].tobytes() if len(opaque_tail) else None
+        return COLOR_PALETTE, bit_depth, index, rgba[:, :3].tobytes(), transparency
+    if (pixels[..., 3] == 255).all():
+        return COLOR_RGB, 8, pixels[..., :3].reshape(height, -1), None, None
+    return COLOR_RGBA, 8, pixels.reshape(height, -1), None, None
+
+
+def encode_png(img, options=None):
+    """Encode a PIL image to deterministic PNG bytes"""
+    options = options or EncodeOptions()
+    img = img.convert('RGBA')
+    if not HAS_NUMPY:
+        # Pillow writes no metadata unless asked, so this is deterministic too
+        buffer = io.BytesIO()
+        img.save(buffer, 'PNG', compress_level=options.level)
+        return buffer.getvalue()
+
+    pixels = np.asarray(img)
+    if options.palette:
+        color_type, bit_depth, rows, palette, transparency = _reduce(pixels)
+    else:
+        color_type, bit_depth, rows, palette, transparency = (
+            COLOR_RGBA, 8, pixels.reshape(img.height, -1), None, None)
+
+    # Palette indices do not benefit from prediction filters
+    if color_type == COLOR_PALETTE and options.filter == 'adaptive':
+        options = EncodeOptions(options.level, 'none', options.strategy, options.palette)
+
+    buffer = io.BytesIO()
+    writer = PngWriter(buffer, img.width, img.height, color_type, bit_depth,
+                       palette, transparency, options)
+    writer.write_rows(rows)
+    writer.close()
+    return buffer.getvalue()
+
+
+def _timed_encode(img, options):
+    start = time.perf_counter()
+    data = encode_png(img, options)
+    return EncodeResult(data, time.perf_counter() - start, img.width * img.height * 4)
+
+
+def encode_many(images, options=None, max_workers=None):
+    """Encode a mapping of name -> image concurrently; returns name -> EncodeResult"""
+    options = options or EncodeOptions()
+    names = list(images)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(lambda name: _timed_encode(images[name], options), names)
+        return dict(zip(names, results))
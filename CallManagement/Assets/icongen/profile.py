@@ -0,0 +1,150 @@
+"""
+Opt-in profiling for the icon scripts
+
+A Profiler wraps named pipeline functions in place, so when profiling is off
+nothing is wrapped and there is no overhead at all. Each call becomes a span
+with wall time, CPU time, tracemalloc peak and the pixel/byte volume it
+produced, written as a Chrome trace (chrome://tracing, Perfetto) plus a
+plain summary table.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import types
+
+from PIL import Image
+
+
+def _volume(value):
+    """(pixels, bytes) held by a stage result: images, encoded data or collections of them"""
+    if isinstance(value, Image.Image):
+        return value.width * value.height, 0
+    if isinstance(value, (bytes, bytearray)):
+        return 0, len(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        pixels = total = 0
+        for item in value:
+            item_pixels, item_bytes = _volume(item)
+            pixels += item_pixels
+            total += item_bytes
+        return pixels, total
+    return 0, 0
+
+
+class Profiler:
+    """Collects spans from wrapped functions and writes them as a trace"""
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.events = []
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter(self):
+        stack = self._stack()
+        frame = {'peak': 0, 'memory': 0}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # Fold the running peak into the parent before resetting it for this span
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['memory'] = current
+        stack.append(frame)
+        frame['wall'] = time.perf_counter()
+        frame['cpu'] = time.thread_time()
+        return frame
+
+    def _exit(self, frame, name, inputs, result):
+        wall = time.perf_counter() - frame['wall']
+        cpu = time.thread_time() - frame['cpu']
+        stack = self._stack()
+        stack.pop()
+        peak = 0
+        if tracemalloc.is_tracing():
+            absolute = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            peak = absolute - frame['memory']
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], absolute)
+        pixels, data_bytes = _volume(result)
+        args = {'cpu_ms': round(cpu * 1000, 3), 'peak_bytes': peak,
+                'pixels': pixels, 'bytes': data_bytes}
+        if inputs:
+            args['inputs'] = inputs
+        with self._lock:
+            self.events.append({
+                'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                'ts': round((frame['wall'] - self._origin) * 1e6, 1),
+                'dur': round(wall * 1e6, 1), 'args': args,
+            })
+
+    def wrap(self, func, name=None, label=None):
+        """func wrapped in a span; label(*args, **kwargs) may refine the span name per call"""
+        name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            span_name = label(*args, **kwargs) if label else name
+            # Numeric arguments (sizes, scales) make spans of repeated calls distinguishable
+            inputs = [a for a in args if isinstance(a, (int, float)) and not isinstance(a, bool)]
+            frame = self._enter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                self._exit(frame, span_name, inputs, result)
+        wrapper.__profiled__ = func
+        return wrapper
+
+    def instrument(self, owner, names, labels=None):
+        """Replace owner.<name> (module globals or class methods) with wrapped versions"""
+        labels = labels or {}
+        for attr in names:
+            func = getattr(owner, attr)
+            if hasattr(func, '__profiled__'):
+                continue
+            prefix = '' if isinstance(owner, types.ModuleType) else owner.__name__ + '.'
+            setattr(owner, attr, self.wrap(func, prefix + attr, labels.get(attr)))
+
+    def span(self, name, func, *args, **kwargs):
+        """Run func(*args, **kwargs) as a one-off span"""
+        return self.wrap(func, name)(*args, **kwargs)
+
+    def write(self, path):
+        """Write the spans as a Chrome trace JSON file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f, indent=1)
+
+    def print_summary(self):
+        """Per-function totals, slowest first"""
+        totals = {}
+        for event in self.events:
+            entry = totals.setdefault(event['name'], [0, 0.0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += event['dur'] / 1000
+            entry[2] += event['args']['cpu_ms']
+            entry[3] = max(entry[3], event['args']['peak_bytes'])
+        print(f"\n{'span':<40} {'calls':>5} {'wall ms':>10} {'cpu ms':>10} {'peak MB':>8}")
+        for name, (calls, wall, cpu, peak) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            print(f"{name:<40} {calls:>5} {wall:>10.1f} {cpu:>10.1f} {peak / 1e6:>8.2f}")
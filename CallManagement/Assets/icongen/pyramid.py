@@ -0,0 +1,54 @@
+"""
+Shared downscale pyramid feeding every icon exporter
+
+Each distinct target size is resampled exactly once. Instead of going back
+to the full-resolution master every time, a level is resized from the
+smallest already-computed level that is still at least `min_ratio` times
+larger, so the work shrinks with every step down. Levels are resampled on
+first use; the planned sizes only decide which level each one cascades
+from, so a build that exports a subset of them does the same resizes an
+eager build would, minus the unused ones.
+"""
+
+from PIL import Image
+
+
+class ResizePyramid:
+    """Cache of resized copies of a square master image, keyed by pixel size"""
+
+    def __init__(self, master, sizes=(), resample=Image.LANCZOS, min_ratio=2, levels=None, resize=None):
+        self.master = master
+        self.resample = resample
+        # resize(image, size) replaces Image.resize with resample, e.g. a selected raster backend
+        self.resize = resize
+        self.min_ratio = min_ratio
+        # Pre-rendered levels (e.g. native per-size renders) are used as-is
+        self.levels = dict(levels or {})
+        self.levels[master.width] = master
+        self.resample_count = 0
+        self.planned = set(sizes)
+
+    def source_size(self, size):
+        """Pixel size of the level size is resampled from: the smallest big enough, else the master"""
+        candidates = [level for level in self.planned | set(self.levels) if level >= size * self.min_ratio]
+        return min(candidates) if candidates else self.master.width
+
+    def _source_for(self, size):
+        return self[self.source_size(size)]
+
+    def __getitem__(self, size):
+        if size not in self.levels:
+            source = self._source_for(size)
+            if self.resize is not None:
+                self.levels[size] = self.resize(source, size)
+            else:
+                self.levels[size] = source.resize((size, size), self.resample)
+            self.resample_count += 1
+        return self.levels[size]
+
+    def __contains__(self, size):
+        return size in self.levels
+
+    def images(self, sizes):
+        """Mapping of pixel size -> image for the requested sizes"""
+        return {size: self[size] for size in sizes}
@@ -0,0 +1,170 @@
+"""
+Declarative icon specs
+
+A spec describes the icon as an ordered list of layers (gradient background,
+handset, signal waves) with colours and geometry in design-space units
+(offsets from the canvas centre at `design_size`). Specs are JSON, or TOML
+on Python 3.11+, so white-label variants are just another spec file.
+"""
+
+import json
+import os
+
+from icongen.paint import GRADIENT_TYPES
+
+try:
+    import tomllib
+    HAS_TOML = True
+except ImportError:
+    HAS_TOML = False
+
+LAYER_TYPES = ('background', 'handset', 'waves')
+
+# The shipped icon: a top-left to bottom-right fill, i.e. CSS linear-gradient(135deg, ...)
+DEFAULT_GRADIENT_SHAPE = {'type': 'linear', 'angle': 135}
+
+# The shipped spec lives with the committed assets, one level above this package
+ASSETS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SPEC_PATH = os.path.join(ASSETS_DIR, "icon_spec.json")
+
+
+def parse_hex_color(value):
+    """'#RRGGBB' or '#RRGGBBAA' -> RGBA tuple"""
+    digits = value.lstrip('#')
+    if len(digits) not in (6, 8):
+        raise ValueError(f"colour must be #RRGGBB or #RRGGBBAA, got {value!r}")
+    rgba = tuple(int(digits[i:i + 2], 16) for i in range(0, len(digits), 2))
+    return rgba if len(rgba) == 4 else rgba + (255,)
+
+
+def _box(item, cx, cy, scale):
+    """Design-space {x, y, width, height} -> pixel bbox around (cx, cy)"""
+    x = cx + int(item['x'] * scale)
+    y = cy + int(item['y'] * scale)
+    return [x, y, x + int(item['width'] * scale), y + int(item['height'] * scale)]
+
+
+class IconSpec:
+    """Parsed, validated icon spec with per-size geometry"""
+
+    def __init__(self, data, name=None):
+        self.data = data
+        self.name = name or data.get('name', 'icon')
+        self.design_size = data.get('design_size', 1024)
+        self.layers = data['layers']
+
+        types = [layer.get('type') for layer in self.layers]
+        unknown = [t for t in types if t not in LAYER_TYPES]
+        if unknown:
+            raise ValueError(f"unknown layer type(s) {unknown}, expected one of {LAYER_TYPES}")
+        if types[:1] != ['background'] or types.count('background') != 1:
+            raise ValueError("spec must have exactly one background layer, listed first")
+
+        gradient = self.layer('background')['gradient']
+        stops = gradient['stops']
+        self.gradient_stops = tuple((float(offset), parse_hex_color(color)[:3]) for offset, color in stops)
+        offsets = [offset for offset, _ in self.gradient_stops]
+        if len(offsets) < 2 or offsets != sorted(offsets):
+            raise ValueError("gradient needs at least two stops in increasing offset order")
+        self.gradient_shape = self._gradient_shape(gradient)
+
+        # Geometry is derived once per size and shared by every render of this spec
+        self._geometry = {}
+
+    @staticmethod
+    def _gradient_shape(gradient):
+        """Normalised gradient geometry (everything but the stops), in canvas fractions"""
+        kind = gradient.get('type', 'linear')
+        if kind not in GRADIENT_TYPES:
+            raise ValueError(f"unknown gradient type {kind!r}, expected one of {GRADIENT_TYPES}")
+        if kind == 'linear':
+            return {'type': kind, 'angle': float(gradient.get('angle', 135))}
+        shape = {'type': kind, 'center': [float(c) for c in gradient.get('center', [0.5, 0.5])],
+                 'angle': float(gradient.get('angle', 0))}
+        if kind == 'radial':
+            shape['radius'] = float(gradient.get('radius', 0.5))
+        return shape
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a .json or .toml spec"""
+        if path.endswith('.toml'):
+            if not HAS_TOML:
+                raise ValueError("TOML specs need Python 3.11+ (tomllib)")
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        default_name = os.path.splitext(os.path.basename(path))[0]
+        return cls(data, data.get('name', default_name))
+
+    def layer(self, layer_type):
+        """First layer of the given type, or None"""
+        for layer in self.layers:
+            if layer['type'] == layer_type:
+                return layer
+        return None
+
+    def layout(self, size):
+        """Background margin and corner radius at size"""
+        background = self.layer('background')
+        scale = size / self.design_size
+        return round(background['margin'] * scale), round(background['radius'] * scale)
+
+    def gradient(self, size):
+        """Background gradient at size (needs NumPy)"""
+        from icongen.gradient import Gradient
+
+        shape = self.gradient_shape
+        if shape['type'] == 'linear':
+            # One table entry per diagonal step, so the 135deg default is exact at every size
+            return Gradient.css_linear(self.gradient_stops, shape['angle'], size, size, resolution=2 * size)
+        center = tuple(c * size for c in shape['center'])
+        return Gradient(self.gradient_stops, shape['type'], center=center,
+                        radius=shape.get('radius', 0.5) * size, angle=shape['angle'])
+
+    def key_data(self):
+        """Everything that affects rendering, for cache keys (the name does not)"""
+        return {'design_size': self.design_size, 'layers': self.layers}
+
+    def geometry(self, size):
+        """Pixel geometry of the handset and waves at size"""
+        if size not in self._geometry:
+            self._geometry[size] = self._build_geometry(size)
+        return self._geometry[size]
+
+    def _build_geometry(self, size):
+        cx, cy = size // 2, size // 2
+        scale = size / self.design_size
+        geometry = {'center': (cx, cy)}
+
+        handset = self.layer('handset')
+        if handset:
+            geometry.update({
+                'rotate': handset.get('rotate', 0),
+                'handset_color': parse_hex_color(handset.get('color', '#FFFFFF')),
+                'handset_ellipses': [_box(e, cx, cy, scale) for e in handset['ellipses']],
+                'handset_bar': [(cx + int(x * scale), cy + int(y * scale)) for x, y in handset['bar']],
+            })
+
+        waves = self.layer('waves')
+        if waves:
+            wave_cx = cx + int(waves['center'][0] * scale)
+            wave_cy = cy + int(waves['center'][1] * scale)
+            # Strokes and the dot keep at least 1 px, so small native renders still show them
+            dot_r = max(1, int(waves['dot_radius'] * scale))
+            geometry.update({
+                'wave_color': parse_hex_color(waves.get('color', '#FFFFFF')),
+                'wave_start': waves.get('start', 180),
+                'wave_end': waves.get('end', 270),
+                'wave_arcs': [
+                    [wave_cx - r, wave_cy - r, wave_cx + r, wave_cy + r]
+                    for r in (int(radius * scale) for radius in waves['radii'])
+                ],
+                'wave_width': max(1, int(waves['width'] * scale)),
+                'dot_color': parse_hex_color(waves.get('dot_color', '#FFFFFF')),
+                'dot': [wave_cx - dot_r, wave_cy - dot_r, wave_cx + dot_r, wave_cy + dot_r],
+            })
+        return geometry
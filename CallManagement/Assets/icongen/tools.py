@@ -0,0 +1,80 @@
+"""
+External converter discovery and concurrent invocation
+
+Tools are looked up once per process with shutil.which, so the fallback
+chain in create_icon.py skips missing converters without spawning them.
+Batches of independent commands (one sips call per iconset size) run as
+concurrent subprocesses under a limit, so a batch takes about as long as
+its slowest command rather than the sum of all of them.
+"""
+
+import asyncio
+import functools
+import os
+import shutil
+import subprocess
+
+# Converter runs are short and partly I/O-bound, so allow more than one per CPU
+DEFAULT_MAX_WORKERS = max(8, os.cpu_count() or 1)
+
+
+class ToolError(RuntimeError):
+    """One or more external commands failed; .failures holds their CompletedProcess"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        lines = [f"{' '.join(map(str, p.args))}: exit {p.returncode}"
+                 + (f": {p.stderr.decode(errors='replace').strip()}" if p.stderr else '')
+                 for p in failures]
+        super().__init__(f"{len(failures)} command(s) failed\n  " + "\n  ".join(lines))
+
+
+@functools.lru_cache(maxsize=None)
+def find_tool(name):
+    """Absolute path of an executable on PATH, or None (cached per process)"""
+    return shutil.which(name)
+
+
+def has_tool(name):
+    return find_tool(name) is not None
+
+
+def run_tool(cmd, check=True):
+    """Run one command with output captured, resolving the executable through the cache"""
+    path = find_tool(cmd[0])
+    if path is None:
+        raise FileNotFoundError(f"{cmd[0]} not found on PATH")
+    result = subprocess.run([path] + list(cmd[1:]), capture_output=True)
+    result.args = list(cmd)
+    if check and result.returncode != 0:
+        raise ToolError([result])
+    return result
+
+
+async def _run_limited(cmd, limit):
+    async with limit:
+        path = find_tool(cmd[0])
+        if path is None:
+            return subprocess.CompletedProcess(list(cmd), 127, b'', f"{cmd[0]} not found on PATH".encode())
+        process = await asyncio.create_subprocess_exec(
+            path, *map(str, cmd[1:]), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
+        return subprocess.CompletedProcess(list(cmd), process.returncode, stdout, stderr)
+
+
+async def _run_batch(commands, max_workers):
+    limit = asyncio.Semaphore(max_workers)
+    return await asyncio.gather(*(_run_limited(cmd, limit) for cmd in commands))
+
+
+def run_all(commands, max_workers=None, check=True):
+    """Run commands concurrently, at most max_workers (default DEFAULT_MAX_WORKERS) at once.
+
+    Every command runs to completion; results come back in input order.
+    With check=True, any non-zero exit raises a ToolError listing all failures.
+    """
+    results = asyncio.run(_run_batch(commands, max_workers or DEFAULT_MAX_WORKERS))
+    failures = [result for result in results if result.returncode != 0]
+    if check and failures:
+        raise ToolError(failures)
+    return results
@@ -0,0 +1,138 @@
+"""
+SVG export of an icon spec
+
+Writes the same layers the raster pipeline draws (gradient rounded rect,
+rotated handset, wave arcs and dot) as a scalable SVG in design-space
+units. Ellipses and arcs are emitted as cubic Bezier paths, so the file
+stays within the subset icongen.svg can rasterize as well. Pure string
+work: no Pillow or NumPy needed.
+"""
+
+import math
+import os
+
+from icongen.paint import css_line
+
+SVG_FILENAME = "AppIcon_spec.svg"
+
+
+def _num(value):
+    """Compact number formatting for SVG attributes"""
+    text = f"{value:.3f}".rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def _hex(color):
+    return '#' + ''.join(f"{c:02X}" for c in color[:3])
+
+
+def _paint(attribute, color):
+    """fill/stroke attribute plus its opacity when the colour is translucent"""
+    text = f'{attribute}="{_hex(color)}"'
+    if len(color) == 4 and color[3] != 255:
+        text += f' {attribute}-opacity="{_num(color[3] / 255)}"'
+    return text
+
+
+def _arc_segments(cx, cy, rx, ry, start, end):
+    """Cubic Bezier commands tracing an elliptical arc clockwise from start to end degrees"""
+    count = max(1, math.ceil(abs(end - start) / 90 - 1e-9))
+    step = math.radians(end - start) / count
+    k = 4 / 3 * math.tan(step / 4)
+    commands = []
+    angle = math.radians(start)
+    for _ in range(count):
+        a0, a1 = angle, angle + step
+        x0, y0 = cx + rx * math.cos(a0), cy + ry * math.sin(a0)
+        x1, y1 = cx + rx * math.cos(a1), cy + ry * math.sin(a1)
+        c1 = (x0 - k * rx * math.sin(a0), y0 + k * ry * math.cos(a0))
+        c2 = (x1 + k * rx * math.sin(a1), y1 - k * ry * math.cos(a1))
+        commands.append('C' + ' '.join(_num(v) for v in (*c1, *c2, x1, y1)))
+        angle = a1
+    return commands
+
+
+def _arc_start(cx, cy, rx, ry, start):
+    a = math.radians(start)
+    return f"M{_num(cx + rx * math.cos(a))} {_num(cy + ry * math.sin(a))}"
+
+
+def _ellipse_path(box):
+    x1, y1, x2, y2 = box
+    cx, cy, rx, ry = (x1 + x2) / 2, (y1 + y2) / 2, (x2 - x1) / 2, (y2 - y1) / 2
+    return _arc_start(cx, cy, rx, ry, 0) + ''.join(_arc_segments(cx, cy, rx, ry, 0, 360)) + 'Z'
+
+
+def _gradient(spec, size, margin):
+    """<defs> gradient element for the background, in the rect's bounding-box units"""
+    shape = spec.gradient_shape
+    stops = ''.join(f'<stop offset="{_num(offset)}" stop-color="{_hex(color)}"/>'
+                    for offset, color in spec.gradient_stops)
+    inner = size - 2 * margin
+    if shape['type'] == 'linear':
+        # Same line as CSS linear-gradient(<angle>deg) across the whole canvas
+        (x1, y1), (x2, y2) = css_line(shape['angle'], size, size)
+        x1, y1, x2, y2 = ((v - margin) / inner for v in (x1, y1, x2, y2))
+        return (f'<linearGradient id="background" x1="{_num(x1)}" y1="{_num(y1)}" '
+                f'x2="{_num(x2)}" y2="{_num(y2)}">{stops}</linearGradient>')
+    if shape['type'] == 'radial':
+        cx, cy = ((c * size - margin) / inner for c in shape['center'])
+        r = shape['radius'] * size / inner
+        return (f'<radialGradient id="background" cx="{_num(cx)}" cy="{_num(cy)}" '
+                f'r="{_num(r)}">{stops}</radialGradient>')
+    raise ValueError(f"{shape['type']} gradients have no SVG equivalent")
+
+
+def icon_svg(spec, size=None):
+    """SVG document text for the spec, drawn at design size and scaled to size px"""
+    design = spec.design_size
+    size = size or design
+    margin, radius = spec.layout(design)
+    geometry = spec.geometry(design)
+    inner = design - 2 * margin
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg width="{size}" height="{size}" viewBox="0 0 {design} {design}" '
+        'xmlns="http://www.w3.org/2000/svg">',
+        f'  <defs>{_gradient(spec, design, margin)}</defs>',
+        f'  <rect x="{margin}" y="{margin}" width="{inner}" height="{inner}" '
+        f'rx="{radius}" ry="{radius}" fill="url(#background)"/>',
+    ]
+    for layer in spec.layers[1:]:
+        if layer['type'] == 'handset':
+            # Image.rotate turns counter-clockwise for positive angles, SVG clockwise
+            cx, cy = geometry['center']
+            d = ''.join(_ellipse_path(box) for box in geometry['handset_ellipses'])
+            bar = geometry['handset_bar']
+            # Wind the bar the same way as the ellipses, so overlaps stay filled under nonzero
+            if sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(bar, bar[1:] + bar[:1])) < 0:
+                bar = bar[::-1]
+            d += 'M' + 'L'.join(f"{_num(x)} {_num(y)}" for x, y in bar) + 'Z'
+            parts.append(f'  <path transform="rotate({_num(-geometry["rotate"])} {cx} {cy})" '
+                         f'{_paint("fill", geometry["handset_color"])} d="{d}"/>')
+        elif layer['type'] == 'waves':
+            # ImageDraw.arc strokes inward from the bounding box, so the centre line is half a width in
+            width = geometry['wave_width']
+            start, end = geometry['wave_start'], geometry['wave_end']
+            for x1, y1, x2, y2 in geometry['wave_arcs']:
+                cx, cy, r = (x1 + x2) / 2, (y1 + y2) / 2, (x2 - x1) / 2 - width / 2
+                d = _arc_start(cx, cy, r, r, start) + ''.join(_arc_segments(cx, cy, r, r, start, end))
+                parts.append(f'  <path fill="none" {_paint("stroke", geometry["wave_color"])} '
+                             f'stroke-width="{width}" d="{d}"/>')
+            parts.append(f'  <path {_paint("fill", geometry["dot_color"])} d="{_ellipse_path(geometry["dot"])}"/>')
+    parts.append('</svg>')
+    return '\n'.join(parts) + '\n'
+
+
+def write_svg(spec, output_dir):
+    """Write AppIcon_spec.svg for the spec into output_dir and return its path.
+
+    Named apart from create_icon.py's AppIcon.svg, which is a different design.
+    """
+    text = icon_svg(spec)
+    svg_path = os.path.join(output_dir, SVG_FILENAME)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(svg_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f"Created: {svg_path}")
+    return svg_path
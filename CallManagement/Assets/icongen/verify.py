@@ -0,0 +1,116 @@
+"""
+Golden-image comparison for rendered icons
+
+Images are compared as premultiplied RGBA, so the colour of (nearly)
+transparent pixels, which no compositor ever shows, does not count as a
+difference. Each comparison reports the per-channel maximum and the mean
+absolute error plus the distance between perceptual (difference) hashes,
+and can render a heatmap of where the two images disagree.
+"""
+
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 8
+
+# Luma difference below which a hash bit is treated as a tie
+HASH_MARGIN = 2.0
+
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+class Tolerance:
+    """Largest accepted per-channel error, mean error and hash distance"""
+
+    def __init__(self, max_error=16, mean_error=1.0, hash_distance=4):
+        self.max_error = max_error
+        self.mean_error = mean_error
+        self.hash_distance = hash_distance
+
+
+# For levels that do not depend on the resize cascade, which reproduce exactly
+EXACT = Tolerance(0, 0.0, 0)
+
+
+class Comparison:
+    """Differences between an expected and an actual image"""
+
+    def __init__(self, name, max_error, mean_error, hash_distance, error=None):
+        self.name = name
+        self.max_error = max_error
+        self.mean_error = mean_error
+        self.hash_distance = hash_distance
+        self.error = error
+        # Per-pixel error, kept for the heatmap
+        self.error_map = None
+
+    def passes(self, tolerance):
+        return (self.error is None
+                and max(self.max_error) <= tolerance.max_error
+                and self.mean_error <= tolerance.mean_error
+                and self.hash_distance <= tolerance.hash_distance)
+
+    def describe(self):
+        if self.error:
+            return self.error
+        channels = '/'.join(str(round(e)) for e in self.max_error)
+        return f"max {channels} (RGBA), mean {self.mean_error:.3f}, hash distance {self.hash_distance}"
+
+
+def premultiplied(img):
+    """Premultiplied RGBA copy of img (Pillow's RGBa mode)"""
+    return img.convert('RGBa')
+
+
+def _hash_gradients(img):
+    """Brightness differences between neighbouring cells of a 9x8 grid (the dHash input)"""
+    small = np.asarray(img.resize((HASH_SIZE + 1, HASH_SIZE), Image.BOX), dtype=np.float32)
+    luma = small[..., :3] @ LUMA
+    return luma[:, 1:] - luma[:, :-1]
+
+
+def difference_hash(img):
+    """64-bit dHash of a premultiplied image"""
+    return int(np.packbits((_hash_gradients(img) > 0).ravel()).view('>u8')[0])
+
+
+def hash_distance(expected, actual):
+    """Bits in which the dHashes of two images differ.
+
+    Bits from cells of near-equal brightness (within HASH_MARGIN) are not
+    counted: at 16 px such ties flip with any resampling change.
+    """
+    a, b = _hash_gradients(expected), _hash_gradients(actual)
+    decisive = np.maximum(np.abs(a), np.abs(b)) > HASH_MARGIN
+    return int(((a > 0) != (b > 0))[decisive].sum())
+
+
+def compare(name, expected, actual):
+    """Comparison of two images; a size mismatch is reported as an error"""
+    if expected.size != actual.size:
+        return Comparison(name, (255,) * 4, 255.0, HASH_SIZE * HASH_SIZE,
+                          f"size {actual.size} does not match expected {expected.size}")
+    expected, actual = premultiplied(expected), premultiplied(actual)
+    a, b = np.asarray(expected), np.asarray(actual)
+    # Errors are only computed where whole pixels differ, usually a small fraction
+    changed = a.view(np.uint32)[..., 0] != b.view(np.uint32)[..., 0]
+    diff = np.abs(a[changed].astype(np.int16) - b[changed])
+    max_error = tuple(int(m) for m in diff.max(axis=0)) if len(diff) else (0,) * 4
+    distance = hash_distance(expected, actual)
+    result = Comparison(name, max_error, float(diff.sum()) / a.size, distance)
+    result.error_map = np.zeros(changed.shape, dtype=np.uint8)
+    if len(diff):
+        result.error_map[changed] = diff.max(axis=1)
+    return result
+
+
+def diff_heatmap(expected, comparison, scale=8):
+    """RGB image: the expected icon dimmed to grey, with differences in red to yellow"""
+    base = np.asarray(premultiplied(expected), dtype=np.float32)[..., :3] @ LUMA
+    heat = np.clip(comparison.error_map.astype(np.float32) * scale, 0, 255)
+    out = np.empty(base.shape + (3,), dtype=np.float32)
+    out[...] = (base * 0.35)[..., None]
+    hot = heat > 0
+    out[hot, 0] = np.maximum(out[hot, 0], 96 + heat[hot] * 159 / 255)
+    out[hot, 1] = np.maximum(out[hot, 1], heat[hot] * 0.8)
+    return Image.fromarray(np.rint(out).astype(np.uint8), 'RGB')
@@ -0,0 +1,72 @@
+"""
+File polling and live preview page for --watch
+
+Polling os.stat is portable (no inotify/FSEvents dependency) and cheap at
+the handful of files a design loop touches.
+"""
+
+import os
+import time
+
+PREVIEW_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title} preview</title>
+<style>
+body {{ margin: 0; padding: 24px; font-family: -apple-system, sans-serif; display: flex; gap: 24px; }}
+.panel {{ padding: 24px; border-radius: 12px; display: flex; align-items: flex-end; gap: 24px; }}
+.light {{ background: #f5f5f7; }}
+.dark {{ background: #1d1d1f; }}
+img {{ display: block; }}
+</style>
+</head>
+<body>
+<div class="panel light">{images}</div>
+<div class="panel dark">{images}</div>
+<script>
+// Reload the preview image twice a second; the watcher rewrites it on every edit
+setInterval(function () {{
+    var stamp = Date.now();
+    document.querySelectorAll('img').forEach(function (img) {{
+        img.src = '{png_name}?' + stamp;
+    }});
+}}, 500);
+</script>
+</body>
+</html>
+"""
+
+PREVIEW_SIZES = (512, 128, 64, 32, 16)
+
+
+def file_stamp(path):
+    """(mtime_ns, size) of path, or None when it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def watch_files(paths, interval=0.2):
+    """Yield the set of changed paths whenever any of them changes; all of them at first"""
+    stamps = {path: file_stamp(path) for path in paths}
+    yield set(paths)
+    while True:
+        time.sleep(interval)
+        changed = set()
+        for path in paths:
+            stamp = file_stamp(path)
+            if stamp != stamps[path]:
+                stamps[path] = stamp
+                changed.add(path)
+        if changed:
+            yield changed
+
+
+def write_preview_page(path, png_name, title, sizes=PREVIEW_SIZES):
+    """HTML page showing the preview PNG at several sizes on light and dark backgrounds"""
+    images = ''.join(f'<img src="{png_name}" width="{size}" height="{size}">' for size in sizes)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(PREVIEW_HTML.format(title=title, images=images, png_name=png_name))
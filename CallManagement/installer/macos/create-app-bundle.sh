@@ -53,8 +53,22 @@ create_app_bundle() {
     # Create PkgInfo
     echo "APPL????" > "$APP_DIR/Contents/PkgInfo"
     
-    # Copy icon if exists
-    if [ -f "$PROJECT_ROOT/Assets/AppIcon.icns" ]; then
+    # Regenerate the icon in-process (works on any host with Python + Pillow),
+    # straight into the bundle so the tracked Assets/AppIcon.icns is left alone
+    ICON_GENERATED=false
+    if command -v python3 >/dev/null 2>&1 && python3 -c "import PIL" 2>/dev/null; then
+        echo "[INFO] Generating AppIcon.icns..."
+        if python3 "$PROJECT_ROOT/Assets/create_icon_v2.py" --icns-only --out "$APP_DIR/Contents/Resources"; then
+            ICON_GENERATED=true
+        else
+            echo "[WARN] Icon generation failed - using existing AppIcon.icns"
+        fi
+    fi
+
+    # Otherwise copy the committed icon if it exists
+    if [ "$ICON_GENERATED" = true ]; then
+        echo "[INFO] Wrote app icon into the bundle"
+    elif [ -f "$PROJECT_ROOT/Assets/AppIcon.icns" ]; then
         echo "[INFO] Copying app icon..."
         cp "$PROJECT_ROOT/Assets/AppIcon.icns" "$APP_DIR/Contents/Resources/"
     else